@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import math
 import os
 import platform
 import shutil
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Iterable
 
 import numpy as np
 import soundfile as sf
 
+from cancel import CancelToken, ProgressCallback
+
 # ---------------------------------------------------------------------
 # Détection ffmpeg / ffprobe "béton"
 # - Dev (repo)
@@ -21,9 +32,35 @@ import soundfile as sf
 # ---------------------------------------------------------------------
 
 _PYDUB_CONFIGURED = False
+_FFMPEG_FOUND = False
 _FFMPEG_PATH: str | None = None
 _FFPROBE_PATH: str | None = None
 
+# Résolution des outils : mémo du processus + dernier résultat trouvé,
+# persisté dans le dossier cache (revalidé par taille + mtime du binaire)
+_TOOLS: dict[str, str | None] = {}
+_TOOLS_LOCK = threading.Lock()
+TOOLS_RECORD_NAME = "tools.json"
+
+# Décodage ffmpeg -> float32 : taille des lectures sur le pipe (octets),
+# marge ajoutée à la durée annoncée par ffprobe (estimation parfois courte, ex. MP3 VBR)
+FFMPEG_READ_BYTES = 1 << 20
+FFMPEG_FRAMES_MARGIN = 0.01
+
+# Lecture WAV par blocs (trames) : pic mémoire = buffer de sortie + un bloc
+WAV_BLOCK_FRAMES = 1 << 16
+
+# Cache disque de l'audio décodé (formats compressés) : budget par défaut,
+# dossier imposé par variable d'environnement (sinon dossier cache de l'OS),
+# partagé avec l'enregistrement des outils (voir find_tool)
+DEFAULT_DECODE_CACHE_BYTES = 4 << 30
+DECODE_CACHE_ENV = "WARPOCALYPSE_CACHE_DIR"
+# Fichiers .tmp d'écriture plus anciens que ça (s) : restes d'un crash, supprimés
+DECODE_CACHE_TMP_MAX_AGE = 600.0
+
+# Résumé de forme d'onde (min/max) construit pendant le chargement : échantillons par case
+PEAK_BIN_SAMPLES = 256
+
 
 def _norm_arch(a: str) -> str:
     a = (a or "").lower()
@@ -134,33 +171,162 @@ def _tool_candidates(root: Path, arch: str, name: str) -> list[Path]:
 
     return candidates
 
-def _find_tool_binary(name: str) -> str | None:
-    arch = _norm_arch(platform.machine())
-    sysname = platform.system().lower()
-
+def _tool_names(name: str) -> list[str]:
     # Windows : essayer .exe d'abord
-    names = [name]
-    if sysname == "windows" and not name.lower().endswith(".exe"):
-        names = [f"{name}.exe", name]
+    if platform.system().lower() == "windows" and not name.lower().endswith(".exe"):
+        return [f"{name}.exe", name]
+    return [name]
 
+
+def _find_bundled_tool(name: str) -> tuple[str, str] | None:
+    """
+    Premier binaire embarqué exécutable, dans l'ordre de priorité des racines :
+    (chemin absolu, chemin relatif à sa racine).
+    """
+    arch = _norm_arch(platform.machine())
     for root in _candidate_roots():
-        for nm in names:
+        for nm in _tool_names(name):
             for cand in _tool_candidates(root, arch, nm):
                 try:
                     if cand.is_file() and os.access(str(cand), os.X_OK):
-                        return str(cand)
+                        return str(cand), cand.relative_to(root).as_posix()
                 except Exception:
                     continue
+    return None
+
 
-    # Fallback PATH
-    for nm in names:
+def _find_path_tool(name: str) -> str | None:
+    for nm in _tool_names(name):
         p = shutil.which(nm)
         if p:
             return p
+    return None
+
 
+def _recorded_bundled_tool(rel: str) -> str | None:
+    """Binaire embarqué enregistré (`rel`, relatif à sa racine) retrouvé sous les racines actuelles."""
+    for root in _candidate_roots():
+        cand = root / rel
+        try:
+            if cand.is_file() and os.access(str(cand), os.X_OK):
+                return str(cand)
+        except Exception:
+            continue
     return None
 
 
+def find_tool(name: str) -> str | None:
+    """
+    Chemin de l'outil `name` (ffmpeg / ffprobe), ou None.
+    Résolu une fois par processus, puis enregistré sur disque :
+      - binaire embarqué : chemin relatif à sa racine, revérifié sous les
+        racines actuelles (stable d'un montage AppImage à l'autre), sans
+        nouveau parcours des dossiers tools/ ;
+      - repli PATH : réutilisé tant que le binaire n'a pas changé (même taille,
+        même mtime), mais seulement après un parcours des binaires embarqués,
+        qui restent prioritaires.
+    Voir invalidate_tool_cache() (nouvelle recherche complète).
+    """
+    with _TOOLS_LOCK:
+        if name in _TOOLS:
+            return _TOOLS[name]
+
+        record = _read_tools_record()
+        entry = record.get(name)
+        entry = entry if isinstance(entry, dict) else {}
+
+        rel = entry.get("bundled")
+        path = _recorded_bundled_tool(rel) if isinstance(rel, str) and rel else None
+        if path is not None:
+            _TOOLS[name] = path
+            return path
+
+        found = _find_bundled_tool(name)
+        if found is not None:
+            # Chemin relatif à la racine : stable d'un montage AppImage à l'autre
+            path, rel = found
+            new_entry = {"bundled": rel}
+        else:
+            path = entry.get("path")
+            if not (path and _tool_signature(path) == [entry.get("size"), entry.get("mtime_ns")]):
+                path = _find_path_tool(name)
+            size, mtime_ns = (_tool_signature(path) if path else None) or [None, None]
+            new_entry = {"path": path, "size": size, "mtime_ns": mtime_ns} if path else {}
+
+        if new_entry != entry:
+            if new_entry:
+                record[name] = new_entry
+            else:
+                record.pop(name, None)
+            _write_tools_record(record)
+
+        _TOOLS[name] = path
+        return path
+
+
+def invalidate_tool_cache(persisted: bool = True) -> None:
+    """
+    Oublie les chemins ffmpeg / ffprobe résolus (prochain appel : nouveau scan).
+    `persisted` : supprime aussi l'enregistrement disque.
+    """
+    global _FFMPEG_FOUND, _PYDUB_CONFIGURED
+    with _TOOLS_LOCK:
+        _TOOLS.clear()
+        _FFMPEG_FOUND = False
+        _PYDUB_CONFIGURED = False
+        if persisted:
+            try:
+                os.remove(_tools_record_path())
+            except OSError:
+                pass
+
+
+def _tool_signature(path: str) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not os.path.isfile(path) or not os.access(path, os.X_OK):
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _tools_context() -> str:
+    # Entrées stables uniquement : sous AppImage, APPDIR, le dossier du module et
+    # sys.executable changent à chaque montage (/tmp/.mount_*), pas $APPIMAGE
+    return "|".join([
+        os.environ.get("APPIMAGE") or sys.executable,
+        platform.system(),
+        platform.machine(),
+    ])
+
+
+def _tools_record_path() -> str:
+    return os.path.join(_user_cache_root(), TOOLS_RECORD_NAME)
+
+
+def _read_tools_record() -> dict:
+    try:
+        with open(_tools_record_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("context") != _tools_context():
+        return {}
+    return data.get("tools") or {}
+
+
+def _write_tools_record(tools: dict) -> None:
+    path = _tools_record_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"context": _tools_context(), "tools": tools}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # non persistant : la résolution reste mémorisée pour ce processus
+
 
 def _configure_pydub(ffmpeg_path: str, ffprobe_path: str | None) -> None:
     """
@@ -187,34 +353,150 @@ def _configure_pydub(ffmpeg_path: str, ffprobe_path: str | None) -> None:
             pass
 
 
+def _ensure_ffmpeg_found() -> str:
+    global _FFMPEG_FOUND, _FFMPEG_PATH, _FFPROBE_PATH
+    if not _FFMPEG_FOUND:
+        _FFMPEG_PATH = find_tool("ffmpeg")
+        _FFPROBE_PATH = find_tool("ffprobe")
+        _FFMPEG_FOUND = True
+
+    if not _FFMPEG_PATH:
+        raise RuntimeError("ffmpeg introuvable : impossible de charger ce format audio.")
+    return _FFMPEG_PATH
+
+
 def _ensure_pydub_ready() -> None:
-    global _PYDUB_CONFIGURED, _FFMPEG_PATH, _FFPROBE_PATH
+    global _PYDUB_CONFIGURED
     if _PYDUB_CONFIGURED:
         return
 
-    _FFMPEG_PATH = _find_tool_binary("ffmpeg")
-    _FFPROBE_PATH = _find_tool_binary("ffprobe")
+    _configure_pydub(_ensure_ffmpeg_found(), _FFPROBE_PATH)
+    _PYDUB_CONFIGURED = True
 
-    if not _FFMPEG_PATH:
-        raise RuntimeError("ffmpeg introuvable : impossible de charger ce format audio.")
 
-    _configure_pydub(_FFMPEG_PATH, _FFPROBE_PATH)
-    _PYDUB_CONFIGURED = True
+def _run_tool_kwargs() -> dict:
+    # Windows : pas de console qui clignote à chaque appel (build fenêtré)
+    return {"creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0)} if os.name == "nt" else {}
+
 
+def _probe_audio(path: str) -> tuple[int, int] | None:
+    """
+    Interroge ffprobe sur le premier flux audio : (sample_rate, frames estimées).
+    None si ffprobe est absent ou ne renvoie pas de sample rate exploitable.
+    """
+    if not _FFPROBE_PATH:
+        return None
+    cmd = [
+        _FFPROBE_PATH, "-v", "error", "-select_streams", "a:0",
+        "-show_entries", "stream=sample_rate,duration:format=duration",
+        "-of", "json", path,
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True, timeout=30, **_run_tool_kwargs()).stdout
+        info = json.loads(out or b"{}")
+    except Exception:
+        return None
 
-def get_ffmpeg_diagnostics(max_candidates_per_root: int = 8) -> str:
+    streams = info.get("streams") or [{}]
+    try:
+        sr = int(streams[0].get("sample_rate") or 0)
+    except (TypeError, ValueError):
+        sr = 0
+    if sr <= 0:
+        return None
+
+    duration = 0.0
+    for raw in (streams[0].get("duration"), (info.get("format") or {}).get("duration")):
+        try:
+            duration = float(raw)
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(duration) and duration > 0.0:
+            break
+        duration = 0.0
+    return sr, int(math.ceil(duration * sr))
+
+
+def _decode_ffmpeg(
+    path: str,
+    sr: int,
+    frames_hint: int = 0,
+    monitor: "_LoadMonitor | None" = None,
+) -> np.ndarray:
+    """
+    Décode le premier flux audio via ffmpeg, directement en float32 mono à `sr`
+    (-f f32le -ac 1 -ar sr sur stdout). Le pipe est lu par blocs dans un buffer
+    préalloué d'après `frames_hint` (agrandi si l'estimation était courte) :
+    une seule copie du signal en mémoire. `monitor` reçoit chaque bloc décodé.
+    """
+    ffmpeg = _ensure_ffmpeg_found()
+    cmd = [
+        ffmpeg, "-nostdin", "-v", "error", "-i", path,
+        "-map", "0:a:0", "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(int(sr)), "-",
+    ]
+    buf = np.empty(max(1, int(frames_hint * (1.0 + FFMPEG_FRAMES_MARGIN)) + 1), dtype=np.float32)
+    pos = 0  # octets reçus
+    done = 0  # trames complètes déjà écrêtées / transmises au monitor
+
+    # stderr vers un fichier temporaire : un flot d'erreurs ne peut pas bloquer le pipe
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=err, **_run_tool_kwargs()
+        )
+        try:
+            while True:
+                if pos >= buf.nbytes:
+                    # Estimation dépassée : agrandissement géométrique
+                    grown = np.empty(2 * len(buf), dtype=np.float32)
+                    grown.view(np.uint8)[:pos] = buf.view(np.uint8)[:pos]
+                    buf = grown
+                n = proc.stdout.readinto(buf.view(np.uint8)[pos:pos + FFMPEG_READ_BYTES])
+                if not n:
+                    break
+                pos += n
+                block = buf[done:pos // 4]
+                np.clip(block, -1.0, 1.0, out=block)
+                done = pos // 4
+                if monitor is not None:
+                    monitor(block)
+        except BaseException:
+            proc.kill()  # annulation / erreur : ffmpeg ne doit pas survivre
+            raise
+        finally:
+            proc.stdout.close()
+            code = proc.wait()
+
+        if code != 0:
+            err.seek(0)
+            msg = err.read().decode("utf-8", errors="replace").strip().splitlines()
+            detail = msg[-1] if msg else f"code {code}"
+            raise RuntimeError(f"ffmpeg : échec du décodage ({detail}).")
+
+    if monitor is not None:
+        monitor.finish()  # durée ffprobe surestimée (MP3 VBR…) : 100 % quand même
+
+    frames = pos // 4
+    # Buffer surdimensionné (estimation très longue) : on rend la mémoire
+    return buf[:frames] if frames >= len(buf) * (1.0 - 2 * FFMPEG_FRAMES_MARGIN) else buf[:frames].copy()
+
+
+def get_ffmpeg_diagnostics(max_candidates_per_root: int = 8, rescan: bool = False) -> str:
     """
     Renvoie un diagnostic texte :
       - chemins trouvés (embarqué / PATH)
       - racines testées
       - quelques candidats testés par racine (présent/exécutable)
+    `rescan` : oublie d'abord les chemins mémorisés (invalidate_tool_cache).
     Ne configure pas pydub et ne lève pas d'exception si ffmpeg manque.
     """
+    if rescan:
+        invalidate_tool_cache()
+
     arch = _norm_arch(platform.machine())
     roots = _candidate_roots()
 
-    found_ffmpeg = _find_tool_binary("ffmpeg")
-    found_ffprobe = _find_tool_binary("ffprobe")
+    found_ffmpeg = find_tool("ffmpeg")
+    found_ffprobe = find_tool("ffprobe")
 
     path_ffmpeg = shutil.which("ffmpeg")
     path_ffprobe = shutil.which("ffprobe")
@@ -229,7 +511,7 @@ def get_ffmpeg_diagnostics(max_candidates_per_root: int = 8) -> str:
         lines.append(f"APPDIR: {os.environ.get('APPDIR')}")
     lines.append("")
 
-    lines.append("Résultat (détection interne):")
+    lines.append(f"Résultat (détection interne, mémorisée dans {_tools_record_path()}):")
     lines.append(f"  ffmpeg : {found_ffmpeg or '— introuvable —'}")
     lines.append(f"  ffprobe: {found_ffprobe or '— introuvable —'}")
     lines.append("")
@@ -275,8 +557,8 @@ def get_ffmpeg_status_short() -> str:
       - "ffmpeg: OK — ffprobe: OK"
       - "ffmpeg: Non trouvé — ffprobe: Non trouvé"
     """
-    ffmpeg = _find_tool_binary("ffmpeg")
-    ffprobe = _find_tool_binary("ffprobe")
+    ffmpeg = find_tool("ffmpeg")
+    ffprobe = find_tool("ffprobe")
 
     s_ffmpeg = "OK" if ffmpeg else "Non trouvé"
     s_ffprobe = "OK" if ffprobe else "Non trouvé"
@@ -284,18 +566,210 @@ def get_ffmpeg_status_short() -> str:
     return f"ffmpeg: {s_ffmpeg} — ffprobe: {s_ffprobe}"
 
 
-def load_audio(path: str) -> tuple[np.ndarray, int]:
+def default_cache_dir() -> str:
+    """Dossier du cache de décodage : $WARPOCALYPSE_CACHE_DIR, sinon cache utilisateur de l'OS."""
+    return os.path.join(_user_cache_root(), "decoded")
+
+
+def _user_cache_root() -> str:
+    env = os.environ.get(DECODE_CACHE_ENV)
+    if env:
+        return env
+    sysname = platform.system().lower()
+    if sysname == "windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(str(Path.home()), "AppData", "Local")
+    elif sysname == "darwin":
+        base = os.path.join(str(Path.home()), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(str(Path.home()), ".cache")
+    return os.path.join(base, "warpocalypse")
+
+
+class DecodeCache:
+    """
+    Cache disque de l'audio décodé (mono float32), borné en octets, LRU.
+
+    Clé : (chemin absolu, taille, mtime, réglages du décodeur) ; un fichier
+    modifié n'est donc jamais servi périmé. Chaque entrée est un .npy nommé
+    <clé>.<sample_rate>.npy, relu avec mmap_mode="r" (zéro copie). L'ordre LRU
+    suit le mtime des fichiers du cache, conservé d'une session à l'autre.
+    Toute erreur disque désactive simplement l'entrée concernée.
+    """
+
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_DECODE_CACHE_BYTES) -> None:
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = int(max(0, max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()  # clé -> (nom, taille)
+        self._bytes = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._scan()
+        except OSError:
+            self.directory = None  # dossier inaccessible : cache inactif
+
+    @staticmethod
+    def key(path: str, settings: str) -> str | None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        raw = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{settings}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, path: str, settings: str | tuple[str, ...]) -> tuple[np.ndarray, int] | None:
+        """
+        Audio décodé en cache, ou None. `settings` : réglages du décodeur, ou
+        plusieurs réglages acceptés (le premier présent en cache est servi).
+        """
+        options = (settings,) if isinstance(settings, str) else settings
+        keys = [self.key(path, s) for s in options] if self.directory else []
+        with self._lock:
+            key = next((k for k in keys if k and k in self._entries), None)
+            entry = self._entries.get(key) if key else None
+            if entry is not None:
+                file = os.path.join(self.directory, entry[0])
+                try:
+                    audio = np.load(file, mmap_mode="r")
+                    os.utime(file)  # LRU persistant
+                except (OSError, ValueError):
+                    self._remove(key)
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return audio, int(entry[0].split(".")[1])
+
+    def put(self, path: str, settings: str, audio: np.ndarray, sr: int) -> None:
+        key = self.key(path, settings) if self.directory else None
+        if key is None or audio.nbytes > self.max_bytes:
+            return
+        name = f"{key}.{int(sr)}.npy"
+        file = os.path.join(self.directory, name)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            try:
+                tmp = file + ".tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, np.asarray(audio, dtype=np.float32))
+                os.replace(tmp, file)
+                size = os.path.getsize(file)
+            except OSError:
+                return  # disque plein / non inscriptible : pas de cache pour ce fichier
+            self._entries[key] = (name, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
+
+    def _scan(self) -> None:
+        found = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy.tmp"):
+                # Écriture interrompue (crash) : jamais comptée ni évincée sinon.
+                # Seulement si ancienne : une autre instance peut être en train d'écrire.
+                file = os.path.join(self.directory, name)
+                try:
+                    if now - os.stat(file).st_mtime > DECODE_CACHE_TMP_MAX_AGE:
+                        os.remove(file)
+                except OSError:
+                    pass
+                continue
+            parts = name.split(".")
+            if len(parts) != 3 or parts[2] != "npy" or not parts[1].isdigit():
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            found.append((st.st_mtime, parts[0], name, st.st_size))
+        for _, key, name, size in sorted(found):
+            self._entries[key] = (name, size)
+            self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        name, size = self._entries.pop(key, ("", 0))
+        self._bytes -= size
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass  # fichier encore mappé (Windows) : sera repris au prochain scan
+
+
+def load_audio(
+    path: str,
+    cache: DecodeCache | None = None,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+    peaks: WaveformPeaks | None = None,
+) -> tuple[np.ndarray, int]:
     """
     Charge un fichier audio et retourne (audio_mono_float32, sample_rate).
     - WAV: lecture directe via soundfile.
-    - Autres formats: via pydub (nécessite ffmpeg).
+    - Autres formats: décodage ffmpeg en float32 mono (sample rate d'origine,
+      lu par ffprobe) ; via pydub si ffprobe est absent.
+      `cache` (DecodeCache) : résultat relu depuis le disque (mmap, lecture
+      seule) si le fichier a déjà été décodé, sinon enregistré.
+
+    Chargement par blocs (pensé pour un thread de travail) : `cancel` est vérifié
+    et `progress("load", échantillons, total estimé)` notifié à chaque bloc ;
+    `peaks` (WaveformPeaks) est rempli au fil des mêmes blocs.
     """
     ext = os.path.splitext(path)[1].lower()
 
     if ext in [".wav", ".wave"]:
-        audio, sr = sf.read(path, always_2d=False, dtype="float32")
-        audio_mono = _to_mono(audio)
-        return audio_mono.astype(np.float32), int(sr)
+        with sf.SoundFile(path) as f:
+            audio = np.empty(f.frames, dtype=np.float32)
+            n = _read_mono(f, audio, monitor=_LoadMonitor.create(f.frames, cancel, progress, peaks))
+            return audio[:n], int(f.samplerate)
+
+    # Le décodeur fait partie de la clé : ffmpeg direct et pydub diffèrent légèrement.
+    # Cache consulté avant de chercher ffmpeg : un fichier déjà décodé reste
+    # lisible si ffmpeg a disparu ou changé de place.
+    if cache is not None:
+        hit = cache.get(path, ("ffmpeg-f32le-mono", "pydub-mono"))
+        if hit is not None:
+            monitor = _LoadMonitor.create(len(hit[0]), cancel, progress, peaks)
+            if monitor is not None:
+                # Fichier mappé : parcouru par blocs (résumé de forme d'onde, progression)
+                for lo in range(0, len(hit[0]), WAV_BLOCK_FRAMES):
+                    monitor(hit[0][lo:lo + WAV_BLOCK_FRAMES])
+            return hit
+
+    _ensure_ffmpeg_found()
+    audio, sr = _decode_compressed(path, cancel, progress, peaks)
+    if cache is not None:
+        cache.put(path, "ffmpeg-f32le-mono" if _FFPROBE_PATH else "pydub-mono", audio, sr)
+    return audio, sr
+
+
+def _decode_compressed(
+    path: str,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+    peaks: WaveformPeaks | None = None,
+) -> tuple[np.ndarray, int]:
+    probe = _probe_audio(path)
+    if probe is not None:
+        sr, frames_hint = probe
+        monitor = _LoadMonitor.create(frames_hint, cancel, progress, peaks)
+        return _decode_ffmpeg(path, sr, frames_hint, monitor), sr
 
     # Fallback pydub (mp3/flac/ogg/...)
     _ensure_pydub_ready()
@@ -313,17 +787,224 @@ def load_audio(path: str) -> tuple[np.ndarray, int]:
     # Normalisation int -> float32 [-1, 1]
     max_val = float(2 ** (8 * seg.sample_width - 1))
     audio = (samples.astype(np.float32) / max_val).clip(-1.0, 1.0)
+
+    # pydub décode d'un bloc : un seul point de progression
+    monitor = _LoadMonitor.create(len(audio), cancel, progress, peaks)
+    if monitor is not None:
+        monitor(audio)
     return audio, sr
 
 
+class WaveformPeaks:
+    """
+    Résumé min/max d'un signal pour l'affichage : une case par `bin_samples`
+    échantillons, construit bloc par bloc (add) pendant le chargement, puis
+    réduit à la largeur voulue par columns().
+    """
+
+    def __init__(self, bin_samples: int = PEAK_BIN_SAMPLES) -> None:
+        self.bin_samples = max(1, int(bin_samples))
+        self.samples = 0
+        self._mins: list[np.ndarray] = []
+        self._maxs: list[np.ndarray] = []
+        self._carry = np.zeros(0, dtype=np.float32)  # case incomplète
+
+    @classmethod
+    def from_array(cls, audio: np.ndarray, bin_samples: int = PEAK_BIN_SAMPLES) -> "WaveformPeaks":
+        peaks = cls(bin_samples)
+        peaks.add(audio)
+        return peaks
+
+    def add(self, block: np.ndarray) -> None:
+        block = np.asarray(block, dtype=np.float32)
+        self.samples += len(block)
+        b = self.bin_samples
+        if len(self._carry):
+            head = block[:b - len(self._carry)]
+            block = block[len(head):]
+            self._carry = np.concatenate([self._carry, head])
+            if len(self._carry) < b:
+                return
+            self._push(self._carry[None, :])
+            self._carry = np.zeros(0, dtype=np.float32)
+        full = len(block) - len(block) % b
+        if full:
+            self._push(block[:full].reshape(-1, b))
+        self._carry = block[full:].copy()
+
+    def bins(self) -> tuple[np.ndarray, np.ndarray]:
+        """(min, max) par case, case incomplète finale comprise."""
+        if len(self._mins) > 1:
+            self._mins = [np.concatenate(self._mins)]
+            self._maxs = [np.concatenate(self._maxs)]
+        mins = self._mins[0] if self._mins else np.zeros(0, dtype=np.float32)
+        maxs = self._maxs[0] if self._maxs else np.zeros(0, dtype=np.float32)
+        if len(self._carry):
+            mins = np.append(mins, self._carry.min())
+            maxs = np.append(maxs, self._carry.max())
+        return mins, maxs
+
+    def columns(self, width: int) -> tuple[np.ndarray, np.ndarray]:
+        """(min, max) sur au plus `width` colonnes couvrant tout le signal."""
+        mins, maxs = self.bins()
+        cols = min(max(1, int(width)), len(mins))
+        if cols == len(mins):
+            return mins, maxs
+        edges = (np.arange(cols) * len(mins)) // cols
+        return np.minimum.reduceat(mins, edges), np.maximum.reduceat(maxs, edges)
+
+    def _push(self, frames: np.ndarray) -> None:
+        self._mins.append(frames.min(axis=1))
+        self._maxs.append(frames.max(axis=1))
+
+
+class WavReader:
+    """
+    Lecteur WAV paresseux, mono float32 : len() + découpage reader[a:b]
+    (downmix à la volée), utilisable comme source par engine.render_stream.
+    Seuls les échantillons demandés sont lus ; le fichier reste ouvert
+    jusqu'à close().
+    """
+
+    ndim = 1
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = sf.SoundFile(path)
+        self._lock = threading.Lock()  # seek + read : une lecture à la fois
+        self.samplerate = int(self._file.samplerate)
+        self.channels = int(self._file.channels)
+        self.frames = int(self._file.frames)
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.frames)
+            if step == 1:
+                return self.read(start, stop)
+            idx = np.arange(start, stop, step)
+            if len(idx) == 0:
+                return np.zeros(0, dtype=np.float32)
+            lo = int(idx.min())
+            return self.read(lo, int(idx.max()) + 1)[idx - lo]
+
+        i = int(key)
+        if i < 0:
+            i += self.frames
+        if not 0 <= i < self.frames:
+            raise IndexError("Indice d'échantillon hors du fichier.")
+        return self.read(i, i + 1)[0]
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """Échantillons [start, stop) en float32 mono."""
+        start = max(0, int(start))
+        out = np.empty(max(0, min(int(stop), self.frames) - start), dtype=np.float32)
+        if len(out) == 0:
+            return out
+        with self._lock:
+            self._file.seek(start)
+            n = _read_mono(self._file, out)
+        return out[:n]
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "WavReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
 def export_wav(path: str, audio: np.ndarray, sr: int) -> None:
     audio = audio.astype(np.float32)
     sf.write(path, audio, int(sr), subtype="PCM_16")
 
 
-def _to_mono(audio: np.ndarray) -> np.ndarray:
-    if audio.ndim == 1:
-        return audio
-    if audio.ndim == 2:
-        return audio.mean(axis=1)
-    raise ValueError("Format audio non supporté (dimensions inattendues).")
+def export_wav_stream(path: str, blocks: Iterable[np.ndarray], sr: int) -> int:
+    """
+    Écrit un WAV (PCM 16) bloc par bloc, par ex. depuis engine.render_stream().
+    Aucun buffer complet n'est construit. Retourne le nombre d'échantillons écrits.
+    """
+    frames = 0
+    with sf.SoundFile(path, mode="w", samplerate=int(sr), channels=1, subtype="PCM_16") as f:
+        for block in blocks:
+            block = np.asarray(block, dtype=np.float32)
+            f.write(block)
+            frames += len(block)
+    return frames
+
+
+def _read_mono(
+    f: sf.SoundFile,
+    out: np.ndarray,
+    block_frames: int = WAV_BLOCK_FRAMES,
+    monitor: "_LoadMonitor | None" = None,
+) -> int:
+    """
+    Lit len(out) trames depuis la position courante de `f` dans `out` (float32),
+    downmix par moyenne des canaux, bloc par bloc. Renvoie le nombre de trames lues.
+    `monitor` reçoit chaque bloc mono.
+    """
+    if f.channels == 1 and monitor is None:
+        return len(f.read(dtype="float32", out=out))
+
+    block = None
+    if f.channels > 1:
+        block = np.empty((min(block_frames, len(out)), f.channels), dtype=np.float32)
+    pos = 0
+    while pos < len(out):
+        k = min(block_frames, len(out) - pos)
+        if block is None:
+            got = len(f.read(dtype="float32", out=out[pos:pos + k]))
+        else:
+            got = len(f.read(dtype="float32", always_2d=True, out=block[:k]))
+            np.mean(block[:got], axis=1, out=out[pos:pos + got])
+        if monitor is not None:
+            monitor(out[pos:pos + got])
+        pos += got
+        if got < k:
+            break
+    return pos
+
+
+class _LoadMonitor:
+    """Annulation, progression et résumé de forme d'onde, appelés à chaque bloc chargé."""
+
+    def __init__(
+        self,
+        total: int,
+        cancel: CancelToken | None,
+        progress: ProgressCallback | None,
+        peaks: WaveformPeaks | None,
+    ) -> None:
+        self.total = int(total)
+        self.done = 0
+        self.cancel = cancel
+        self.progress = progress
+        self.peaks = peaks
+
+    @classmethod
+    def create(cls, total, cancel, progress, peaks) -> "_LoadMonitor | None":
+        if cancel is None and progress is None and peaks is None:
+            return None
+        return cls(total, cancel, progress, peaks)
+
+    def __call__(self, block: np.ndarray) -> None:
+        if self.cancel is not None:
+            self.cancel.raise_if_cancelled()
+        if self.peaks is not None:
+            self.peaks.add(block)
+        self.done += len(block)
+        if self.progress is not None:
+            # Total estimé (ffprobe) : peut être dépassé
+            self.progress("load", self.done, max(self.total, self.done))
+
+    def finish(self) -> None:
+        """Fin de lecture : total ramené au nombre d'échantillons réellement chargés."""
+        if self.progress is not None and self.done != self.total:
+            self.total = self.done
+            self.progress("load", self.done, self.done)
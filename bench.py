@@ -0,0 +1,298 @@
+# bench.py
+"""
+Benchmarks de engine.render et warp_engine.warp_segments.
+
+Signaux synthétiques générés localement (aucun asset requis), matrice de cas :
+durée source × grain_ms_min/max × keep_original_ratio × shuffle_amount × warp_amount.
+Chaque cas tourne dans un processus neuf pour mesurer un pic RSS qui lui est propre.
+
+Exemples :
+  python bench.py                         # matrice rapide, JSON sur stdout
+  python bench.py --full -o bench.json    # matrice complète (1 s -> 1 h)
+  python bench.py --durations 1 60 --warp 0 0.5 --repeat 5
+  python bench.py --compare avant.json apres.json
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any
+
+import numpy as np
+
+from presets import Params
+
+SR = 44100
+
+QUICK_MATRIX: dict[str, list] = {
+    "durations": [1.0, 10.0, 60.0],
+    "grains": [(10, 30), (80, 220)],
+    "keep": [0.25],
+    "shuffle": [0.0, 0.7],
+    "warp": [0.0, 0.5],
+}
+
+FULL_MATRIX: dict[str, list] = {
+    "durations": [1.0, 10.0, 60.0, 600.0, 3600.0],
+    "grains": [(10, 30), (80, 220), (500, 1500)],
+    "keep": [0.0, 0.25, 1.0],
+    "shuffle": [0.0, 0.7, 1.0],
+    "warp": [0.0, 0.5, 1.0],
+}
+
+# Le warp (STFT par grain) est beaucoup plus lent : durée max testée avec warp > 0
+DEFAULT_MAX_WARP_SECONDS = 600.0
+
+
+# ----------------------------- signal ---------------------------------
+
+def synth_signal(seconds: float, sr: int = SR, seed: int = 0) -> np.ndarray:
+    """
+    Signal de test mono float32 dans [-1, 1] : accord de sinus à enveloppe lente,
+    bruit rose approximatif et transitoires, pour exercer le warp de façon réaliste.
+    Généré par blocs (pas de tableau temporaire float64 de la taille du signal).
+    """
+    n = int(round(seconds * sr))
+    out = np.empty(n, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    freqs = np.array([110.0, 220.0, 277.18, 329.63, 440.0])
+    block = 1 << 18
+    for lo in range(0, n, block):
+        t = np.arange(lo, min(n, lo + block), dtype=np.float64) / sr
+        env = 0.5 + 0.5 * np.sin(2.0 * np.pi * 0.25 * t)
+        tone = np.sin(2.0 * np.pi * freqs[:, None] * t[None, :]).sum(axis=0) / len(freqs)
+        noise = np.cumsum(rng.standard_normal(len(t))) * 0.002
+        noise -= noise.mean()
+        clicks = (rng.random(len(t)) < 2.0 / sr) * rng.uniform(-0.8, 0.8, len(t))
+        out[lo:lo + len(t)] = np.clip(0.5 * env * tone + 0.1 * noise + clicks, -1.0, 1.0)
+    return out
+
+
+# ----------------------------- mesures ---------------------------------
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : Ko ; macOS : octets
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _run_once(audio: np.ndarray, params: Params, target: str) -> tuple[float, dict[str, Any]]:
+    """
+    Une exécution de `target` : (secondes, infos complémentaires).
+    Cible "warp" : seul warp_segments est chronométré (découpage exclu).
+    """
+    if target == "render":
+        from engine import render
+
+        t0 = time.perf_counter()
+        res = render(audio, SR, params)
+        elapsed = time.perf_counter() - t0
+        if res.stats is None:
+            return elapsed, {}
+        return elapsed, {
+            "segments": res.segments_count,
+            "stage_seconds": res.stats.stage_seconds,
+            "grains_warped": res.stats.grains_warped,
+        }
+
+    from engine import grain_bounds_samples, slice_into_random_grains
+    from warp_engine import warp_segments
+
+    rng = np.random.default_rng(int(params.seed))
+    segments = slice_into_random_grains(audio, rng, *grain_bounds_samples(params, SR))
+    t0 = time.perf_counter()
+    warp_segments(segments, SR, rng, params)
+    return time.perf_counter() - t0, {"segments": len(segments)}
+
+
+def run_case(case: dict[str, Any], repeat: int, target: str) -> dict[str, Any]:
+    """Exécuté dans un processus dédié : chronomètre un cas `repeat` fois."""
+    audio = synth_signal(case["duration"])
+    params = Params(
+        grain_ms_min=case["grain_ms_min"],
+        grain_ms_max=case["grain_ms_max"],
+        keep_original_ratio=case["keep_original_ratio"],
+        shuffle_amount=case["shuffle_amount"],
+        warp_amount=case["warp_amount"],
+    )
+    # Échauffement hors chronométrage : imports paresseux, JIT numba, caches librosa
+    _run_once(audio[: min(len(audio), SR)], params, target)
+    rss_before = _peak_rss_bytes()
+
+    times: list[float] = []
+    extra: dict[str, Any] = {}
+    for _ in range(repeat):
+        elapsed, info = _run_once(audio, params, target)
+        times.append(elapsed)
+        extra = info or extra
+
+    best = min(times)
+    n = len(audio)
+    return {
+        **case,
+        "target": target,
+        "samples": n,
+        "times": times,
+        "best_seconds": best,
+        "median_seconds": sorted(times)[len(times) // 2],
+        "samples_per_second": n / best if best > 0 else None,
+        "realtime_factor": case["duration"] / best if best > 0 else None,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "peak_rss_before_bytes": rss_before,
+        **extra,
+    }
+
+
+def build_cases(matrix: dict[str, list], max_warp_seconds: float) -> list[dict[str, Any]]:
+    cases = []
+    for dur, (gmin, gmax), keep, shuffle, warp in itertools.product(
+        matrix["durations"], matrix["grains"], matrix["keep"], matrix["shuffle"], matrix["warp"]
+    ):
+        if warp > 0.0 and dur > max_warp_seconds:
+            continue
+        cases.append({
+            "duration": float(dur),
+            "grain_ms_min": int(gmin),
+            "grain_ms_max": int(gmax),
+            "keep_original_ratio": float(keep),
+            "shuffle_amount": float(shuffle),
+            "warp_amount": float(warp),
+        })
+    return cases
+
+
+def _metadata() -> dict[str, Any]:
+    meta: dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sr": SR,
+    }
+    try:
+        meta["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        meta["git_commit"] = None
+    return meta
+
+
+def run_benchmarks(cases: list[dict[str, Any]], repeat: int, targets: list[str]) -> dict[str, Any]:
+    results = []
+    ctx = get_context("spawn")
+    for case in cases:
+        for target in targets:
+            if target == "warp" and case["warp_amount"] <= 0.0:
+                continue
+            # Processus neuf par cas : pic RSS propre au cas
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                r = pool.submit(run_case, case, repeat, target).result()
+            results.append(r)
+            print(
+                f"[{target:6}] {case['duration']:>7.0f} s  grains {case['grain_ms_min']}-{case['grain_ms_max']} ms  "
+                f"keep {case['keep_original_ratio']:.2f}  shuffle {case['shuffle_amount']:.2f}  warp {case['warp_amount']:.2f}"
+                f"  ->  {r['best_seconds']:.3f} s  x{r['realtime_factor']:.1f} temps réel",
+                file=sys.stderr,
+            )
+    return {"meta": _metadata(), "repeat": repeat, "results": results}
+
+
+# ----------------------------- comparaison ---------------------------------
+
+def _case_key(r: dict[str, Any]) -> tuple:
+    return (
+        r["target"], r["duration"], r["grain_ms_min"], r["grain_ms_max"],
+        r["keep_original_ratio"], r["shuffle_amount"], r["warp_amount"],
+    )
+
+
+def compare(path_a: str, path_b: str) -> str:
+    """Tableau texte : temps de B relatif à A pour les cas communs (<1 = plus rapide)."""
+    with open(path_a, "r", encoding="utf-8") as f:
+        a = {_case_key(r): r for r in json.load(f)["results"]}
+    with open(path_b, "r", encoding="utf-8") as f:
+        b = {_case_key(r): r for r in json.load(f)["results"]}
+
+    lines = [f"{'cas':<60} {'A (s)':>9} {'B (s)':>9} {'B/A':>6}"]
+    for key in sorted(set(a) & set(b)):
+        ta = a[key]["best_seconds"]
+        tb = b[key]["best_seconds"]
+        target, dur, gmin, gmax, keep, shuffle, warp = key
+        label = f"{target} {dur:.0f}s g{gmin}-{gmax} k{keep:.2f} s{shuffle:.2f} w{warp:.2f}"
+        ratio = tb / ta if ta > 0 else float("inf")
+        lines.append(f"{label:<60} {ta:>9.3f} {tb:>9.3f} {ratio:>6.2f}")
+    return "\n".join(lines)
+
+
+# ----------------------------- CLI ---------------------------------
+
+def _parse_grains(values: list[str]) -> list[tuple[int, int]]:
+    out = []
+    for v in values:
+        a, _, b = v.partition("-")
+        out.append((int(a), int(b or a)))
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmarks Warpocalypse (render / warp).")
+    ap.add_argument("--full", action="store_true", help="matrice complète (jusqu'à 1 h de source)")
+    ap.add_argument("--durations", type=float, nargs="+", help="durées source (s)")
+    ap.add_argument("--grains", nargs="+", help="plages de grains en ms, ex: 80-220")
+    ap.add_argument("--keep", type=float, nargs="+", help="keep_original_ratio")
+    ap.add_argument("--shuffle", type=float, nargs="+", help="shuffle_amount")
+    ap.add_argument("--warp", type=float, nargs="+", help="warp_amount")
+    ap.add_argument("--max-warp-seconds", type=float, default=DEFAULT_MAX_WARP_SECONDS,
+                    help="durée max des cas avec warp > 0")
+    ap.add_argument("--targets", nargs="+", choices=["render", "warp"], default=["render", "warp"])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("-o", "--output", help="fichier JSON (défaut : stdout)")
+    ap.add_argument("--compare", nargs=2, metavar=("A.json", "B.json"), help="compare deux résultats")
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        print(compare(*args.compare))
+        return 0
+
+    matrix = dict(FULL_MATRIX if args.full else QUICK_MATRIX)
+    if args.durations:
+        matrix["durations"] = args.durations
+    if args.grains:
+        matrix["grains"] = _parse_grains(args.grains)
+    if args.keep:
+        matrix["keep"] = args.keep
+    if args.shuffle:
+        matrix["shuffle"] = args.shuffle
+    if args.warp:
+        matrix["warp"] = args.warp
+
+    cases = build_cases(matrix, args.max_warp_seconds)
+    report = run_benchmarks(cases, max(1, args.repeat), args.targets)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# bytecache.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class ByteLRUCache:
+    """
+    Cache LRU borné en octets (thread-safe).
+    Chaque entrée déclare sa taille à l'insertion ; les entrées les moins
+    récemment utilisées sont évincées dès que le budget est dépassé.
+    `on_evict(clé, valeur)` (optionnel) est appelé pour chaque entrée évincée,
+    hors verrou (ex. écriture sur disque).
+    """
+
+    def __init__(self, max_bytes: int, on_evict: Optional[Callable[[Hashable, Any], None]] = None) -> None:
+        self.max_bytes = int(max(0, max_bytes))
+        self.on_evict = on_evict
+        self._items: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> None:
+        nbytes = int(max(0, nbytes))
+        evicted: list[tuple[Hashable, Any]] = []
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            # Entrée plus grosse que le budget : non mise en cache
+            if nbytes > self.max_bytes:
+                evicted.append((key, value))
+            else:
+                self._items[key] = (value, nbytes)
+                self._bytes += nbytes
+                while self._bytes > self.max_bytes and self._items:
+                    k, (v, size) = self._items.popitem(last=False)
+                    self._bytes -= size
+                    evicted.append((k, v))
+        if self.on_evict is not None:
+            for k, v in evicted:
+                self.on_evict(k, v)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
@@ -0,0 +1,57 @@
+# cancel.py
+"""
+Annulation coopérative et suivi de progression des rendus.
+Partagé par engine et warp_engine (aucune dépendance lourde).
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Iterator
+
+# progress(étape, grains_traités, grains_total)
+ProgressCallback = Callable[[str, int, int], None]
+
+# Granularité (en grains) des vérifications d'annulation / notifications
+PROGRESS_BATCH = 256
+
+
+class RenderCancelled(Exception):
+    """Rendu interrompu via CancelToken.cancel()."""
+
+
+class CancelToken:
+    """Jeton d'annulation partagé entre l'appelant (UI) et le thread de rendu."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise RenderCancelled("Rendu annulé.")
+
+
+def iter_batches(
+    n: int,
+    stage: str,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+    batch: int = PROGRESS_BATCH,
+) -> Iterator[tuple[int, int]]:
+    """
+    Découpe range(n) en lots (lo, hi). Vérifie l'annulation avant chaque lot
+    et notifie la progression après.
+    """
+    for lo in range(0, n, batch):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        hi = min(n, lo + batch)
+        yield lo, hi
+        if progress is not None:
+            progress(stage, hi, n)
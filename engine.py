@@ -1,58 +1,840 @@
 # engine.py
 from __future__ import annotations
+import threading
+import time
 import numpy as np
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Iterator, Sequence
+from bytecache import ByteLRUCache
+from cancel import PROGRESS_BATCH, CancelToken, ProgressCallback, RenderCancelled, iter_batches
 from presets import Params
 
 
+# Modes de rendu :
+#   - "vectorized" : tirages groupés + écriture dans un buffer préalloué (défaut)
+#   - "reference"  : boucle historique grain par grain (tests d'équivalence)
+#   - "parallel"   : plan tiré dans le processus courant, warp + assemblage
+#                    répartis sur un pool de processus (résultat identique)
+RENDER_MODES = ("vectorized", "reference", "parallel")
+
+# Nombre de lots de grains par worker en mode parallèle (équilibrage)
+PARALLEL_CHUNKS_PER_WORKER = 4
+
+# Backends d'assemblage : "auto" (numba si disponible), "numba", "numpy"
+ASSEMBLY_BACKENDS = ("auto", "numba", "numpy")
+
+# Taille de bloc par défaut pour render_stream (échantillons)
+DEFAULT_STREAM_BLOCK = 1 << 16
+
+
+# Callback d'étape : on_stage(nom_étape, secondes), appelé à la fin de chaque étape
+StageCallback = Callable[[str, float], None]
+
+
+@dataclass
+class RenderStats:
+    """
+    Mesures d'un rendu, pour journaliser / détecter les régressions.
+    Étapes : "slice", "plan" (tirage des décisions de warp), "warp" (traitement
+    des grains), "arrange", "assemble". Mode "parallel" : warp compté dans
+    "assemble" (exécutés ensemble) ; mode "reference" : tirage compté dans "warp".
+    """
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    audio_seconds: float = 0.0      # durée de la source
+    grains: int = 0
+    grains_warped: int = 0          # stretch et/ou pitch
+    grains_stretched: int = 0
+    grains_pitched: int = 0
+    grains_skipped: int = 0         # warp actif, mais grain laissé intact (trop court / non tiré)
+    warp_cache_hits: int = 0        # grains warpés servis par le WarpCache
+    warp_cache_misses: int = 0
+    bytes_allocated: int = 0        # principales allocations : table, grains warpés, sortie
+
+    @property
+    def realtime_factor(self) -> float:
+        """Secondes d'audio traitées par seconde de calcul."""
+        if self.wall_seconds <= 0.0:
+            return float("inf")
+        return self.audio_seconds / self.wall_seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        d = asdict(self)
+        d["realtime_factor"] = self.realtime_factor
+        return d
+
+
 @dataclass
 class RenderResult:
     audio: np.ndarray
     segments_count: int
+    stats: RenderStats | None = None
+
 
+@dataclass
+class GrainTable:
+    """
+    Table de grains en struct-of-arrays (une ligne par grain).
+    Les grains référencent `source` par offset : le découpage et les étapes
+    suivantes (reorder, reverse, gain, fade, warp) ne copient aucun échantillon ;
+    l'audio n'est matérialisé qu'à l'assemblage final (assemble_grains).
+    """
+    source: Sequence       # np.ndarray ou lecteur paresseux (voir render_stream)
+    start: np.ndarray      # int64, offset dans source
+    length: np.ndarray     # int64
+    reverse: np.ndarray    # bool
+    gain_db: np.ndarray    # float64
+    rate: np.ndarray       # float64, time-stretch (NaN = non appliqué)
+    n_steps: np.ndarray    # float64, pitch-shift en demi-tons (NaN = non appliqué)
+
+    @staticmethod
+    def from_bounds(source: Sequence, start: np.ndarray, length: np.ndarray) -> "GrainTable":
+        n = len(start)
+        return GrainTable(
+            source=source,
+            start=np.asarray(start, dtype=np.int64),
+            length=np.asarray(length, dtype=np.int64),
+            reverse=np.zeros(n, dtype=bool),
+            gain_db=np.zeros(n, dtype=np.float64),
+            rate=np.full(n, np.nan),
+            n_steps=np.full(n, np.nan),
+        )
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def nbytes(self) -> int:
+        """Empreinte mémoire de la table (hors buffer source)."""
+        return int(sum(a.nbytes for a in (self.start, self.length, self.reverse, self.gain_db, self.rate, self.n_steps)))
+
+    def grain(self, i: int) -> np.ndarray:
+        """Vue (sans copie) sur le grain i dans la source."""
+        s = int(self.start[i])
+        return self.source[s:s + int(self.length[i])]
+
+    def take(self, order: np.ndarray) -> "GrainTable":
+        """Nouvelle table avec les lignes réordonnées (la source reste partagée)."""
+        return GrainTable(
+            source=self.source,
+            start=self.start[order],
+            length=self.length[order],
+            reverse=self.reverse[order],
+            gain_db=self.gain_db[order],
+            rate=self.rate[order],
+            n_steps=self.n_steps[order],
+        )
 
-def render(audio: np.ndarray, sr: int, params: Params) -> RenderResult:
+    def warped_mask(self) -> np.ndarray:
+        return ~(np.isnan(self.rate) & np.isnan(self.n_steps))
+
+
+def render(
+    audio: np.ndarray,
+    sr: int,
+    params: Params,
+    *,
+    mode: str = "vectorized",
+    workers: int | None = None,
+    on_stage: StageCallback | None = None,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+    warp_cache: Any = None,
+) -> RenderResult:
     """
     Déstructure un audio mono float32 [-1,1] en segments aléatoires contrôlés.
     Reproductible via seed.
+
+    `mode` choisit l'implémentation (voir RENDER_MODES). Tous les modes consomment
+    le RNG dans le même ordre : pour une source dans [-1, 1], le résultat est
+    identique à l'arrondi float32 près.
+
+    `workers` : mode "parallel", nombre de processus (défaut : nombre de cœurs) ;
+    mode "vectorized", warp seul réparti sur `workers` processus si > 1 (grains
+    les plus longs d'abord). Le résultat ne dépend pas du nombre de workers.
+
+    Les mesures du rendu sont dans `RenderResult.stats` ; `on_stage(nom, secondes)`
+    est appelé à la fin de chaque étape.
+
+    `cancel` (CancelToken) est vérifié par lot de grains : RenderCancelled est levée
+    dès qu'il est déclenché. `progress(étape, fait, total)` est notifié par lot.
+
+    `warp_cache` (warp_engine.WarpCache, mode "vectorized") : grains warpés
+    réutilisés d'un rendu à l'autre.
     """
     if audio.ndim != 1:
         raise ValueError("Le moteur attend un audio mono (tableau 1D).")
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Mode de rendu inconnu : {mode!r} (attendu : {', '.join(RENDER_MODES)}).")
 
+    clock = _StageClock(_new_stats(audio, sr), on_stage)
+    t0 = time.perf_counter()
+
+    if mode == "reference":
+        res = _render_reference(audio, sr, params, clock, cancel, progress)
+    elif mode == "parallel":
+        res = _render_parallel(audio, sr, params, workers, clock, cancel, progress)
+    else:
+        table = _plan(audio, sr, params, clock, cancel)
+        with clock.stage("warp"):
+            warped = _warp_table_grains(table, sr, params, cancel, progress, warp_cache, clock.stats, workers)
+        with clock.stage("assemble"):
+            rendered = assemble_grains(table, sr, params, warped=warped, cancel=cancel, progress=progress)
+        _count_table(clock.stats, table, params, warped)
+        res = RenderResult(audio=rendered, segments_count=len(table))
+
+    return _finish(res, clock, t0)
+
+
+# Rendu factice de warm_up() : durée (s) et grains (ms) couvrant WSOLA et phase vocoder
+WARM_UP_SECONDS = 0.5
+WARM_UP_GRAIN_MS = (30, 120)
+
+
+def warm_up(params: Params | None = None, sr: int = 44100) -> None:
+    """
+    Prépare le premier rendu (à appeler en tâche de fond, ex. au démarrage de l'UI) :
+    imports paresseux (warp_engine, librosa selon le backend, numba), chargement ou
+    compilation du noyau d'assemblage et registre FFT, via un court rendu factice
+    avec warp systématique. Les réglages de warp de `params` (backend, qualité)
+    sont conservés ; le premier vrai rendu est alors aussi rapide que les suivants.
+    Lève RuntimeError si le backend de warp choisi est indisponible.
+    """
+    p = Params.from_dict(params.to_dict()) if params is not None else Params()
+    p.warp_amount = 1.0
+    p.warp_stretch_prob = p.warp_pitch_prob = 1.0
+    p.grain_ms_min, p.grain_ms_max = WARM_UP_GRAIN_MS
+    _import_warp_engine().ensure_warp_deps_available(p)
+    _numba_assemble_kernel()
+
+    n = int(WARM_UP_SECONDS * sr)
+    x = (0.1 * np.sin(2.0 * np.pi * 220.0 * np.arange(n) / sr)).astype(np.float32)
+    render(x, sr, p)
+
+
+def render_stream(
+    source: Sequence,
+    sr: int,
+    params: Params,
+    block_size: int = DEFAULT_STREAM_BLOCK,
+) -> Iterator[np.ndarray]:
+    """
+    Rendu en flux : génère des blocs float32 de `block_size` échantillons
+    (le dernier peut être plus court). Même résultat que render() pour la même seed.
+
+    `source` : tableau 1D ou lecteur paresseux (len() + découpage source[a:b]
+    renvoyant un tableau mono float32), par ex. np.memmap.
+    Seul le plan (O(nombre de grains)) est gardé en mémoire ; l'audio est lu,
+    assemblé et émis par fenêtres d'environ `block_size` échantillons.
+    """
+    if getattr(source, "ndim", 1) != 1:
+        raise ValueError("Le moteur attend un audio mono (tableau 1D).")
+    block_size = int(block_size)
+    if block_size <= 0:
+        raise ValueError("block_size doit être > 0.")
+
+    table = plan_render(source, sr, params)
+    n = len(table)
+
+    # Découpe le plan en lots de grains consécutifs couvrant ~block_size échantillons
+    ends = np.cumsum(table.length)
+    carry = np.zeros(0, dtype=np.float32)
+    lo = 0
+    while lo < n:
+        base = int(ends[lo - 1]) if lo > 0 else 0
+        hi = int(np.searchsorted(ends, base + block_size, side="left")) + 1
+        hi = min(max(hi, lo + 1), n)
+
+        chunk = assemble_grains(table.take(np.arange(lo, hi)), sr, params)
+        buf = np.concatenate([carry, chunk]) if len(carry) else chunk
+
+        pos = 0
+        while len(buf) - pos >= block_size:
+            yield buf[pos:pos + block_size].copy()
+            pos += block_size
+        carry = buf[pos:].copy()
+        lo = hi
+
+    if len(carry):
+        yield carry
+
+
+def plan_render(source: Sequence, sr: int, params: Params) -> GrainTable:
+    """
+    Tire toutes les décisions du rendu (découpage, warp, ordre, reverse, gain)
+    sans toucher à l'audio. Les lignes de la table sont dans l'ordre de sortie.
+    """
+    return _plan(source, sr, params, _StageClock(RenderStats()))
+
+
+def _plan(source: Sequence, sr: int, params: Params, clock: "_StageClock", cancel: CancelToken | None = None) -> GrainTable:
     rng = np.random.default_rng(int(params.seed))
+    with clock.stage("slice"):
+        table = _stage_slice(source, sr, rng, params)
+    _check_cancel(cancel)
+    with clock.stage("plan"):
+        _stage_warp(table, rng, params)
+    _check_cancel(cancel)
+    with clock.stage("arrange"):
+        table, _ = _stage_arrange(table, rng, params)
+    _check_cancel(cancel)
+    return table
 
-    # Sanity
-    grain_min = int(max(10, params.grain_ms_min))
-    grain_max = int(max(grain_min, params.grain_ms_max))
 
+def _check_cancel(cancel: CancelToken | None) -> None:
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+
+
+# ----------------------------- mesures ---------------------------------
+
+class _StageClock:
+    """Chronomètre les étapes d'un rendu et notifie `on_stage`."""
+
+    def __init__(self, stats: RenderStats, on_stage: StageCallback | None = None) -> None:
+        self.stats = stats
+        self.on_stage = on_stage
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        yield
+        dt = time.perf_counter() - t0
+        self.stats.stage_seconds[name] = self.stats.stage_seconds.get(name, 0.0) + dt
+        if self.on_stage is not None:
+            self.on_stage(name, dt)
+
+
+def _end_stage(clock: _StageClock, name: str, t0: float) -> None:
+    """Variante de clock.stage() pour du code non découpable en bloc `with`."""
+    dt = time.perf_counter() - t0
+    clock.stats.stage_seconds[name] = clock.stats.stage_seconds.get(name, 0.0) + dt
+    if clock.on_stage is not None:
+        clock.on_stage(name, dt)
+
+
+def _new_stats(audio: Sequence, sr: int) -> RenderStats:
+    return RenderStats(audio_seconds=(len(audio) / float(sr)) if sr else 0.0)
+
+
+def _count_table(stats: RenderStats, table: GrainTable, params: Params, warped: dict[int, np.ndarray] | None = None) -> None:
+    stats.grains = len(table)
+    stats.grains_stretched = int(np.count_nonzero(~np.isnan(table.rate)))
+    stats.grains_pitched = int(np.count_nonzero(~np.isnan(table.n_steps)))
+    stats.grains_warped = int(np.count_nonzero(table.warped_mask()))
+    stats.grains_skipped = (stats.grains - stats.grains_warped) if _warp_enabled(params) else 0
+    stats.bytes_allocated += table.nbytes
+    if warped:
+        stats.bytes_allocated += sum(y.nbytes for y in warped.values())
+
+
+def _finish(res: RenderResult, clock: _StageClock, t0: float) -> RenderResult:
+    clock.stats.wall_seconds = time.perf_counter() - t0
+    clock.stats.bytes_allocated += res.audio.nbytes
+    if not clock.stats.grains:
+        clock.stats.grains = res.segments_count
+    res.stats = clock.stats
+    return res
+
+
+# ----------------------------- étapes ---------------------------------
+# Chaque étape continue le même RNG : l'ordre des appels fixe le résultat.
+
+# Champs de Params dont dépend chaque étape (clés de cache de RenderPipeline)
+SLICE_FIELDS = ("seed", "grain_ms_min", "grain_ms_max")
+WARP_FIELDS = (
+    "warp_amount",
+    "warp_stretch_min", "warp_stretch_max",
+    "warp_pitch_min_st", "warp_pitch_max_st",
+    "warp_stretch_prob", "warp_pitch_prob",
+    "warp_preserve_length",
+    "warp_short_grains",
+    "warp_backend",
+    "warp_quality",
+    "intensity",
+)
+ARRANGE_FIELDS = ("keep_original_ratio", "shuffle_amount", "reverse_prob", "gain_db_min", "gain_db_max", "intensity")
+
+
+def _stage_slice(source: Sequence, sr: int, rng: np.random.Generator, params: Params) -> GrainTable:
+    # Découpage : frontières seulement, la source n'est pas copiée
+    min_s, max_s = grain_bounds_samples(params, sr)
+    return slice_grain_table(source, rng, min_s, max_s)
+
+
+def _stage_warp(table: GrainTable, rng: np.random.Generator, params: Params) -> None:
+    # Seules les décisions sont tirées ici ; le traitement a lieu à l'assemblage.
+    if _warp_enabled(params):
+        table.rate, table.n_steps = _warp_decisions(table.length, rng, params)
+
+
+def _stage_arrange(table: GrainTable, rng: np.random.Generator, params: Params) -> tuple[GrainTable, np.ndarray]:
+    """Ordre + reverse + gain. Renvoie la table réordonnée et l'ordre (indices source)."""
     intensity = float(np.clip(params.intensity, 0.0, 2.0))
     shuffle_amount = float(np.clip(params.shuffle_amount, 0.0, 1.0))
     reverse_prob = float(np.clip(params.reverse_prob, 0.0, 1.0))
     keep_ratio = float(np.clip(params.keep_original_ratio, 0.0, 1.0))
 
-    # Convert ms -> samples
-    min_s = ms_to_samples(grain_min, sr)
-    max_s = ms_to_samples(grain_max, sr)
+    n = len(table)
+    order = _draw_order(n, rng, keep_ratio, shuffle_amount)
+    table = table.take(order)
 
-    segments = slice_into_random_grains(audio, rng, min_s, max_s)
+    # Tirages groupés : même séquence que la boucle de référence
+    # (par grain de sortie : reverse puis gain).
+    u = rng.random((n, 2))
+    p_rev = np.clip(reverse_prob * intensity, 0.0, 1.0)
+    table.reverse = u[:, 0] < p_rev
 
-    # --- Warp (time-stretch / pitch) ---------------------------------
-    # Appliqué avant le reorder/reverse/gain.
-    # Dépendance optionnelle: si warp_amount > 0, librosa doit être installé.
-    if float(np.clip(getattr(params, "warp_amount", 0.0), 0.0, 1.0)) > 0.0:
-        try:
-            from warp_engine import warp_segments  # import lazy
-        except Exception as e:
-            raise RuntimeError("Warp activé, mais warp_engine n'est pas disponible.") from e
+    g_min, g_max = gain_bounds(params)
+    table.gain_db = sample_gain_db_array(u[:, 1], g_min, g_max, intensity)
+    return table, order
+
+
+# ----------------------------- rendu incrémental ---------------------------------
+
+# Budget mémoire par défaut du cache d'étapes (octets)
+DEFAULT_PIPELINE_CACHE_BYTES = 512 * 1024 * 1024
+
+
+class RenderPipeline:
+    """
+    Rendu incrémental : chaque étape (découpage, warp, arrangement) est mise en
+    cache, indexée par la seule partie de Params dont elle dépend, avec l'état
+    du RNG à sa sortie. Modifier le gain ou le reverse ne relance donc ni le
+    découpage ni le warp (le plus coûteux : les grains warpés sont conservés).
+
+    Le résultat est identique à render(). Cache LRU borné à `max_bytes`.
+
+    En complément, `warp_cache` (warp_engine.WarpCache, créé au premier warp si
+    absent) garde les grains warpés un par un, par contenu et décision : il sert
+    aussi quand les paramètres de warp ou la seed changent, et survit à clear().
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_PIPELINE_CACHE_BYTES,
+        warp_cache: Any = None,
+        workers: int | None = None,
+    ) -> None:
+        self.cache = ByteLRUCache(max_bytes)
+        self.warp_cache = warp_cache
+        self.workers = workers  # warp multi-processus si > 1 (voir render())
+        self._source: Sequence | None = None
+        self._epoch = 0  # incrémenté à chaque changement de source / clear()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.cache.clear()
+            self._source = None
+            self._epoch += 1
+
+    def _get(self, epoch: int, key: tuple) -> Any:
+        # Source changée (ou clear()) pendant le rendu : le cache ne le concerne plus
+        with self._lock:
+            return self.cache.get(key) if epoch == self._epoch else None
+
+    def _put(self, epoch: int, key: tuple, value: Any, nbytes: int) -> None:
+        # Même cas : résultat périmé, non publié
+        with self._lock:
+            if epoch == self._epoch:
+                self.cache.put(key, value, nbytes)
+
+    def _warp_cache_for(self, table: GrainTable) -> Any:
+        if not table.warped_mask().any():
+            return self.warp_cache
+        with self._lock:
+            if self.warp_cache is None:
+                self.warp_cache = _import_warp_engine().WarpCache()
+            return self.warp_cache
+
+    def render(
+        self,
+        audio: np.ndarray,
+        sr: int,
+        params: Params,
+        on_stage: StageCallback | None = None,
+        cancel: CancelToken | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> RenderResult:
+        """Voir render() pour `on_stage`, `cancel` et `progress`."""
+        if audio.ndim != 1:
+            raise ValueError("Le moteur attend un audio mono (tableau 1D).")
+
+        # Étape servie par le cache : durée ~0 dans les stats
+        clock = _StageClock(_new_stats(audio, sr), on_stage)
+        t0 = time.perf_counter()
+
+        # Verrou limité aux accès au cache : les calculs tournent hors verrou,
+        # clear() ou un autre rendu n'attendent donc jamais la fin d'une étape.
+        with self._lock:
+            # Nouvelle source : tout le cache est caduc
+            if audio is not self._source:
+                self.cache.clear()
+                self._source = audio
+                self._epoch += 1
+            epoch = self._epoch
+
+        slice_key = ("slice", int(sr), len(audio)) + _fields_key(params, SLICE_FIELDS)
+        warp_key = ("warp",) + slice_key + (_fields_key(params, WARP_FIELDS) if _warp_enabled(params) else ("off",))
+        arrange_key = ("arrange",) + warp_key + _fields_key(params, ARRANGE_FIELDS)
+
+        # 1) Découpage
+        with clock.stage("slice"):
+            hit = self._get(epoch, slice_key)
+            if hit is None:
+                rng = np.random.default_rng(int(params.seed))
+                table = _stage_slice(audio, sr, rng, params)
+                hit = (table.start, table.length, rng.bit_generator.state)
+                self._put(epoch, slice_key, hit, table.start.nbytes + table.length.nbytes)
+            start, length, slice_state = hit
+        _check_cancel(cancel)
+
+        # 2) Warp : décisions ("plan") + grains warpés ("warp"), indexés par grain source
+        with clock.stage("plan"):
+            hit = self._get(epoch, warp_key)
+            if hit is None:
+                rng = _rng_from_state(slice_state)
+                table = GrainTable.from_bounds(audio, start, length)
+                _stage_warp(table, rng, params)
+        with clock.stage("warp"):
+            if hit is None:
+                warp_cache = self._warp_cache_for(table)
+                warped = _warp_table_grains(
+                    table, sr, params, cancel, progress, warp_cache, clock.stats, self.workers
+                )
+                hit = (table.rate, table.n_steps, warped, rng.bit_generator.state)
+                nbytes = table.rate.nbytes + table.n_steps.nbytes + sum(y.nbytes for y in warped.values())
+                self._put(epoch, warp_key, hit, nbytes)
+            rate, n_steps, warped, warp_state = hit
+        _check_cancel(cancel)
+
+        # 3) Arrangement (ordre, reverse, gain)
+        with clock.stage("arrange"):
+            hit = self._get(epoch, arrange_key)
+            if hit is None:
+                rng = _rng_from_state(warp_state)
+                table = GrainTable.from_bounds(audio, start, length)
+                table.rate, table.n_steps = rate, n_steps
+                hit = _stage_arrange(table, rng, params)
+                self._put(epoch, arrange_key, hit, hit[0].nbytes + hit[1].nbytes)
+            table, order = hit
+
+        # Les grains warpés en cache sont réindexés dans l'ordre de sortie
+        warped_out = {i: warped[src] for i, src in enumerate(order.tolist()) if src in warped}
+        with clock.stage("assemble"):
+            rendered = assemble_grains(table, sr, params, warped=warped_out, cancel=cancel, progress=progress)
+        _count_table(clock.stats, table, params)
+        return _finish(RenderResult(audio=rendered, segments_count=len(table)), clock, t0)
+
+
+def _fields_key(params: Params, fields: tuple[str, ...]) -> tuple:
+    return tuple(getattr(params, f, None) for f in fields)
+
+
+def _rng_from_state(state: dict) -> np.random.Generator:
+    rng = np.random.default_rng()
+    rng.bit_generator.state = state
+    return rng
+
+
+def _warp_table_grains(
+    table: GrainTable,
+    sr: int,
+    params: Params,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+    cache: Any = None,
+    stats: RenderStats | None = None,
+    workers: int | None = None,
+) -> dict[int, np.ndarray]:
+    """
+    Calcule les grains warpés d'une table (clé : indice de ligne).
+    Traitement groupé (warp_batch) par lot de lignes, ou warp_batch_parallel
+    si `workers` > 1.
+    `cache` (WarpCache, source en mémoire uniquement) : grains déjà calculés
+    réutilisés ; succès / échecs comptés dans `stats`.
+    """
+    warped: dict[int, np.ndarray] = {}
+    mask = table.warped_mask()
+    if len(table) == 0 or not mask.any():
+        return warped
+    we = _import_warp_engine()
+    rows = np.flatnonzero(mask)
+
+    if not isinstance(table.source, np.ndarray):
+        cache = None
+    sid = cache.source_id(table.source) if cache is not None else None
+    hits0, misses0 = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+    if workers is not None and workers > 1:
+        # Un seul appel : le découpage en lots est fait par warp_batch_parallel
+        grains = [table.grain(i) for i in rows.tolist()]
+        ids = [(sid, start) for start in table.start[rows].tolist()] if cache is not None else None
+        ys = _call_warp(
+            we.warp_batch_parallel, grains, sr, table.rate[rows], table.n_steps[rows], params,
+            workers, cache, ids, cancel, progress,
+        )
+        warped.update(zip(rows.tolist(), ys))
+    else:
+        for lo, hi in iter_batches(len(rows), "warp", cancel, progress):
+            idx = rows[lo:hi]
+            grains = [table.grain(i) for i in idx.tolist()]
+            ids = [(sid, start) for start in table.start[idx].tolist()] if cache is not None else None
+            ys = _call_warp(we.warp_batch, grains, sr, table.rate[idx], table.n_steps[idx], params, cache, ids)
+            warped.update(zip(idx.tolist(), ys))
+
+    if cache is not None and stats is not None:
+        stats.warp_cache_hits += cache.hits - hits0
+        stats.warp_cache_misses += cache.misses - misses0
+    return warped
 
+
+def assemble_grains(
+    table: GrainTable,
+    sr: int,
+    params: Params,
+    warped: dict[int, np.ndarray] | None = None,
+    backend: str = "auto",
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+) -> np.ndarray:
+    """
+    Assemblage final d'une GrainTable (lignes dans l'ordre de sortie) :
+    warp, reverse, gain et fades écrits dans un seul buffer préalloué, puis clip.
+    `warped` : grains déjà warpés (clé : indice de ligne), sinon calculés ici.
+    `backend` : voir ASSEMBLY_BACKENDS ("auto" = numba si disponible, sinon NumPy).
+    `cancel` / `progress` : vérifiés / notifiés par lot de grains (étape "assemble").
+    """
+    if backend not in ASSEMBLY_BACKENDS:
+        raise ValueError(f"Backend d'assemblage inconnu : {backend!r} (attendu : {', '.join(ASSEMBLY_BACKENDS)}).")
+
+    n = len(table)
+
+    # Seuls les grains warpés sont matérialisés (leur longueur peut changer)
+    if warped is None:
+        warped = _warp_table_grains(table, sr, params, cancel, progress)
+    out_lengths = table.length.copy()
+    for i, y in warped.items():
+        out_lengths[i] = len(y)
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(out_lengths, out=offsets[1:])
+
+    gains = 10.0 ** (table.gain_db / 20.0)
+    out = np.empty(int(offsets[-1]), dtype=np.float32)
+
+    kernel = None
+    if backend != "numpy" and isinstance(table.source, np.ndarray):
+        kernel = _numba_assemble_kernel()
+        if kernel is None and backend == "numba":
+            raise RuntimeError("Assemblage numba demandé, mais numba n'est pas disponible.")
+
+    if kernel is not None:
         try:
-            segments = warp_segments(segments, sr, rng, params)
-        except RuntimeError:
-            # message déjà explicite (librosa manquant, etc.)
+            _assemble_numba(kernel, table, warped, gains, offsets, out_lengths, out, cancel, progress)
+            return out
+        except RenderCancelled:
             raise
-        except Exception as e:
-            raise RuntimeError(f"Warp: échec lors du traitement des grains: {e}") from e
+        except Exception:
+            if backend == "numba":
+                raise
+            # Compilation impossible (build figé, cache non inscriptible…) : voie NumPy
+            _disable_numba()
+
+    fades = fade_lengths(out_lengths)
+    for lo, hi in iter_batches(n, "assemble", cancel, progress):
+        for i in range(lo, hi):
+            seg = warped.get(i)
+            if seg is None:
+                seg = table.grain(i)
+            if table.reverse[i]:
+                seg = seg[::-1]
+            np.multiply(seg, float(gains[i]), out=out[offsets[i]:offsets[i + 1]])
+
+        apply_fades_inplace(out, offsets[lo:hi], out_lengths[lo:hi], fades[lo:hi])
+        chunk = out[offsets[lo]:offsets[hi]]
+        np.clip(chunk, -1.0, 1.0, out=chunk)
+    return out
+
+
+def _assemble_numba(
+    kernel,
+    table: GrainTable,
+    warped: dict[int, np.ndarray],
+    gains: np.ndarray,
+    offsets: np.ndarray,
+    out_lengths: np.ndarray,
+    out: np.ndarray,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+) -> None:
+    # Les grains warpés (peu nombreux) sont écrits côté NumPy, le noyau fait le reste
+    skip = np.zeros(len(table), dtype=np.bool_)
+    for i, y in warped.items():
+        seg = y[::-1] if table.reverse[i] else y
+        np.multiply(seg, float(gains[i]), out=out[offsets[i]:offsets[i + 1]])
+        skip[i] = True
+
+    source = np.asarray(table.source)
+    gains = gains.astype(source.dtype)
+    fades = fade_lengths(out_lengths)
+    for lo, hi in iter_batches(len(table), "assemble", cancel, progress):
+        kernel(
+            source,
+            table.start[lo:hi],
+            out_lengths[lo:hi],
+            offsets[lo:hi],
+            table.reverse[lo:hi],
+            gains[lo:hi],
+            fades[lo:hi],
+            skip[lo:hi],
+            out,
+        )
+
+
+# Noyau numba : None = pas encore chargé, False = indisponible
+_NUMBA_KERNEL = None
+
+
+def _numba_assemble_kernel():
+    """Charge (une fois) le noyau numba ; None si numba est indisponible."""
+    global _NUMBA_KERNEL
+    if _NUMBA_KERNEL is None:
+        try:
+            from numba_kernels import assemble_kernel  # import lazy (numba est lourd)
+            _NUMBA_KERNEL = assemble_kernel
+        except Exception:
+            _NUMBA_KERNEL = False
+    return _NUMBA_KERNEL or None
+
+
+def _disable_numba() -> None:
+    global _NUMBA_KERNEL
+    _NUMBA_KERNEL = False
+
+
+def _render_parallel(
+    audio: np.ndarray,
+    sr: int,
+    params: Params,
+    workers: int | None,
+    clock: _StageClock,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+) -> RenderResult:
+    """
+    Toute la partie aléatoire (plan) est tirée ici, séquentiellement : les workers
+    n'exécutent que du déterministe (warp + assemblage) sur des lots de grains
+    consécutifs. Les lots sont recollés dans l'ordre, d'où un résultat identique
+    à render() quel que soit le nombre de workers.
+    """
+    from procpool import default_workers  # import lazy
+
+    workers = default_workers() if workers is None else max(1, int(workers))
+    table = _plan(audio, sr, params, clock, cancel)
+    n = len(table)
+    _count_table(clock.stats, table, params)
+
+    # Warp + assemblage (indissociables ici : exécutés ensemble dans les workers)
+    with clock.stage("assemble"):
+        rendered = _assemble_parallel(audio, table, sr, params, workers, cancel, progress)
+    return RenderResult(audio=rendered, segments_count=n)
+
 
+def _assemble_parallel(
+    audio: np.ndarray,
+    table: GrainTable,
+    sr: int,
+    params: Params,
+    workers: int,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+) -> np.ndarray:
+    from procpool import SharedArray, balanced_chunks, run_chunks  # import lazy
+
+    n = len(table)
+    chunks = balanced_chunks(table.length, workers * PARALLEL_CHUNKS_PER_WORKER)
+    if workers == 1 or len(chunks) <= 1:
+        parts = []
+        for rows in chunks:
+            _check_cancel(cancel)
+            parts.append(assemble_grains(table.take(rows), sr, params))
+            if progress is not None:
+                progress("assemble", int(rows[-1]) + 1, n)
+    else:
+        with SharedArray(audio) as shared:
+            jobs = [
+                (
+                    shared.spec,
+                    table.start[rows], table.length[rows], table.reverse[rows],
+                    table.gain_db[rows], table.rate[rows], table.n_steps[rows],
+                    sr, params,
+                )
+                for rows in chunks
+            ]
+            parts = run_chunks(
+                workers, _assemble_chunk_worker, jobs, [len(rows) for rows in chunks], "assemble", cancel, progress
+            )
+
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+
+def _assemble_chunk_worker(
+    source_spec: tuple,
+    start: np.ndarray,
+    length: np.ndarray,
+    reverse: np.ndarray,
+    gain_db: np.ndarray,
+    rate: np.ndarray,
+    n_steps: np.ndarray,
+    sr: int,
+    params: Params,
+) -> np.ndarray:
+    """Exécuté dans un worker : assemble un lot de lignes d'une GrainTable."""
+    from procpool import call_with_shared
+
+    def _assemble(source: np.ndarray) -> np.ndarray:
+        return assemble_grains(GrainTable(source, start, length, reverse, gain_db, rate, n_steps), sr, params)
+
+    return call_with_shared(source_spec, _assemble)
+
+
+def _render_reference(
+    audio: np.ndarray,
+    sr: int,
+    params: Params,
+    clock: _StageClock,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+) -> RenderResult:
+    """
+    Implémentation historique (boucle Python grain par grain).
+    Conservée comme référence pour les tests d'équivalence.
+    (Compteurs de warp non renseignés dans les stats.)
+    """
+    rng = np.random.default_rng(int(params.seed))
+
+    intensity = float(np.clip(params.intensity, 0.0, 2.0))
+    shuffle_amount = float(np.clip(params.shuffle_amount, 0.0, 1.0))
+    reverse_prob = float(np.clip(params.reverse_prob, 0.0, 1.0))
+    keep_ratio = float(np.clip(params.keep_original_ratio, 0.0, 1.0))
+
+    min_s, max_s = grain_bounds_samples(params, sr)
+
+    with clock.stage("slice"):
+        segments = slice_into_random_grains(audio, rng, min_s, max_s)
+
+    # --- Warp (time-stretch / pitch) ---------------------------------
+    # Appliqué avant le reorder/reverse/gain.
+    # Backend "librosa" : dépendance optionnelle, doit alors être installé.
+    with clock.stage("warp"):
+        if _warp_enabled(params):
+            segments = _warp(segments, sr, rng, params, cancel, progress)
+    _check_cancel(cancel)
+
+    arrange_t0 = time.perf_counter()
 
     # Garde une portion de segments à leur place
     n = len(segments)
@@ -71,9 +853,16 @@ def render(audio: np.ndarray, sr: int, params: Params) -> RenderResult:
                 continue
             order[a], order[b] = order[b], order[a]
 
+    _end_stage(clock, "arrange", arrange_t0)
+    assemble_t0 = time.perf_counter()
+
     # Applique reverse / gain
     out = []
     for i_out, i_src in enumerate(order):
+        if i_out % PROGRESS_BATCH == 0:
+            _check_cancel(cancel)
+            if progress is not None and i_out:
+                progress("assemble", i_out, n)
         seg = segments[i_src]
 
         # Reverse (probabilité modulée par intensity)
@@ -82,10 +871,7 @@ def render(audio: np.ndarray, sr: int, params: Params) -> RenderResult:
             seg = seg[::-1].copy()
 
         # Gain dB (borné). intensity augmente la dispersion sans dépasser les bornes.
-        g_min = float(params.gain_db_min)
-        g_max = float(params.gain_db_max)
-        if g_max < g_min:
-            g_min, g_max = g_max, g_min
+        g_min, g_max = gain_bounds(params)
 
         # On recentre autour de 0 en élargissant la plage, mais clamp aux bornes
         # (Ici, intensity agit plutôt sur le tirage: plus intensity est élevé, plus on tire vers les extrêmes.)
@@ -97,11 +883,98 @@ def render(audio: np.ndarray, sr: int, params: Params) -> RenderResult:
 
         out.append(seg)
 
+    if progress is not None and n:
+        progress("assemble", n, n)
+
     rendered = np.concatenate(out) if out else np.array([], dtype=np.float32)
     rendered = np.clip(rendered, -1.0, 1.0).astype(np.float32)
+    _end_stage(clock, "assemble", assemble_t0)
     return RenderResult(audio=rendered, segments_count=n)
 
 
+def grain_bounds_samples(params: Params, sr: int) -> tuple[int, int]:
+    """Bornes de taille de grain (ms -> échantillons), après garde-fous."""
+    grain_min = int(max(10, params.grain_ms_min))
+    grain_max = int(max(grain_min, params.grain_ms_max))
+    return ms_to_samples(grain_min, sr), ms_to_samples(grain_max, sr)
+
+
+def gain_bounds(params: Params) -> tuple[float, float]:
+    """Bornes de gain (dB), remises dans l'ordre si inversées."""
+    g_min = float(params.gain_db_min)
+    g_max = float(params.gain_db_max)
+    if g_max < g_min:
+        g_min, g_max = g_max, g_min
+    return g_min, g_max
+
+
+def _warp_enabled(params: Params) -> bool:
+    return float(np.clip(getattr(params, "warp_amount", 0.0), 0.0, 1.0)) > 0.0
+
+
+def _import_warp_engine():
+    try:
+        import warp_engine  # import lazy
+    except Exception as e:
+        raise RuntimeError("Warp activé, mais warp_engine n'est pas disponible.") from e
+    return warp_engine
+
+
+def _call_warp(fn, *args):
+    try:
+        return fn(*args)
+    except (RuntimeError, RenderCancelled):
+        # message déjà explicite (librosa manquant, etc.) / annulation
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Warp: échec lors du traitement des grains: {e}") from e
+
+
+def _warp(
+    segments: list[np.ndarray],
+    sr: int,
+    rng: np.random.Generator,
+    params: Params,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+) -> list[np.ndarray]:
+    return _call_warp(_import_warp_engine().warp_segments, segments, sr, rng, params, cancel, progress)
+
+
+def _warp_decisions(lengths: np.ndarray, rng: np.random.Generator, params: Params) -> tuple[np.ndarray, np.ndarray]:
+    # Plan tiré en une fois ; ses colonnes suivent ensuite les grains dans la table
+    plan = _call_warp(_import_warp_engine().plan_warp, lengths, rng, params)
+    return plan.rate, plan.n_steps
+
+
+def _draw_order(n: int, rng: np.random.Generator, keep_ratio: float, shuffle_amount: float) -> np.ndarray:
+    """
+    Ordre de sortie des grains : mélange plus ou moins fort, une portion
+    (keep_ratio) restant à sa place.
+    """
+    # Garde une portion de segments à leur place
+    keep_n = int(round(n * keep_ratio))
+    keep = np.zeros(n, dtype=bool)
+    if keep_n > 0:
+        keep[rng.choice(n, size=keep_n, replace=False)] = True
+
+    order = np.arange(n, dtype=np.int64)
+    if n > 1 and shuffle_amount > 0.0:
+        # Mélange progressif : on fait un certain nombre de swaps proportionnel au shuffle_amount
+        swaps = int((n * 3) * shuffle_amount)  # heuristique simple
+        # Tirage groupé (a, b) par swap : même séquence que des appels successifs
+        pairs = rng.integers(0, n, size=(swaps, 2)).tolist()
+        kept = keep.tolist()
+        o = order.tolist()
+        for a, b in pairs:
+            if kept[a] or kept[b]:
+                continue
+            o[a], o[b] = o[b], o[a]
+        order = np.asarray(o, dtype=np.int64)
+
+    return order
+
+
 def ms_to_samples(ms: int, sr: int) -> int:
     return int(round((ms / 1000.0) * sr))
 
@@ -134,6 +1007,52 @@ def slice_into_random_grains(audio: np.ndarray, rng: np.random.Generator, min_s:
     return segments
 
 
+def slice_grain_bounds(n: int, rng: np.random.Generator, min_s: int, max_s: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Même découpage que slice_into_random_grains, mais ne renvoie que les frontières
+    (starts, lengths) en int64, sans copier l'audio.
+
+    Les tailles sont tirées par lots tant que la borne haute vaut max_s : la séquence
+    RNG consommée est identique à celle de la boucle échantillon par échantillon.
+    """
+    # Empêche un grain trop petit/absurde
+    min_s = max(16, min_s)
+    max_s = max(min_s, max_s)
+
+    chunks: list[np.ndarray] = []
+    i = 0
+    while i < n:
+        # Dernier segment: si le reste est trop court, on le fusionne au segment précédent
+        remaining = n - i
+        if remaining <= min_s:
+            if chunks:
+                chunks[-1][-1] += remaining
+            else:
+                chunks.append(np.array([remaining], dtype=np.int64))
+            break
+
+        # Nombre de tirages pour lesquels min(max_s, remaining) == max_s à coup sûr
+        k = (remaining - 1) // max_s
+        if k > 0:
+            sizes = rng.integers(min_s, max_s + 1, size=k).astype(np.int64)
+        else:
+            sizes = np.array([rng.integers(min_s, min(max_s, remaining) + 1)], dtype=np.int64)
+        chunks.append(sizes)
+        i += int(sizes.sum())
+
+    lengths = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    if len(lengths) > 1:
+        np.cumsum(lengths[:-1], out=starts[1:])
+    return starts, lengths
+
+
+def slice_grain_table(audio: Sequence, rng: np.random.Generator, min_s: int, max_s: int) -> GrainTable:
+    """Découpe `audio` en une GrainTable (coût mémoire O(nombre de grains))."""
+    starts, lengths = slice_grain_bounds(len(audio), rng, min_s, max_s)
+    return GrainTable.from_bounds(audio, starts, lengths)
+
+
 def apply_gain_db(seg: np.ndarray, gain_db: float) -> np.ndarray:
     factor = float(10.0 ** (gain_db / 20.0))
     return (seg * factor).astype(np.float32)
@@ -151,6 +1070,45 @@ def apply_fade(seg: np.ndarray, fade_samples: int) -> np.ndarray:
     return out
 
 
+def fade_lengths(lengths: np.ndarray) -> np.ndarray:
+    """Longueurs de fade par grain (même règle que le rendu de référence)."""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    fades = np.minimum(256, np.maximum(8, lengths // 20))
+    return np.minimum(fades, lengths // 2)
+
+
+def apply_fades_inplace(buf: np.ndarray, offsets: np.ndarray, lengths: np.ndarray, fades: np.ndarray) -> None:
+    """
+    Applique fade-in / fade-out à tous les grains d'un buffer déjà assemblé.
+    Rampes identiques à apply_fade (np.linspace float32), calculées en un seul lot.
+    """
+    fades = np.asarray(fades, dtype=np.int64)
+    total = int(fades.sum())
+    if total == 0:
+        return
+
+    first = np.zeros(len(fades), dtype=np.int64)
+    np.cumsum(fades[:-1], out=first[1:])
+    k = np.arange(total, dtype=np.int64) - np.repeat(first, fades)
+    f = np.repeat(fades, fades)
+
+    # Reproduit np.linspace : y = k * step + start, dernier point forcé à stop
+    div = np.maximum(f - 1, 1).astype(np.float64)
+    kf = k.astype(np.float64)
+    last = (k == f - 1) & (f > 1)
+    ramp_in = kf * (1.0 / div)
+    ramp_in[last] = 1.0
+    ramp_out = kf * (-1.0 / div) + 1.0
+    ramp_out[last] = 0.0
+
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    idx_in = np.repeat(offsets, fades) + k
+    idx_out = np.repeat(offsets + lengths - fades, fades) + k
+    buf[idx_in] *= ramp_in.astype(np.float32)
+    buf[idx_out] *= ramp_out.astype(np.float32)
+
+
 def sample_gain_db(rng: np.random.Generator, g_min: float, g_max: float, intensity: float) -> float:
     # Tirage biaisé vers les extrêmes quand intensity > 1
     u = float(rng.random())
@@ -161,3 +1119,14 @@ def sample_gain_db(rng: np.random.Generator, g_min: float, g_max: float, intensi
         k = min(8.0, 1.0 + (intensity - 1.0) * 6.0)
         t = (u ** k) if u < 0.5 else (1.0 - ((1.0 - u) ** k))
     return float(g_min + (g_max - g_min) * t)
+
+
+def sample_gain_db_array(u: np.ndarray, g_min: float, g_max: float, intensity: float) -> np.ndarray:
+    """Version vectorisée de sample_gain_db à partir de tirages uniformes `u`."""
+    u = np.asarray(u, dtype=np.float64)
+    if intensity <= 1.0:
+        t = u
+    else:
+        k = min(8.0, 1.0 + (intensity - 1.0) * 6.0)
+        t = np.where(u < 0.5, u ** k, 1.0 - ((1.0 - u) ** k))
+    return g_min + (g_max - g_min) * t
@@ -0,0 +1,254 @@
+# live_engine.py
+"""
+Lecture granulaire temps réel : les grains sont générés à la volée dans le
+callback d'un sounddevice.OutputStream, à partir du buffer source.
+
+Mêmes paramètres que le rendu hors-ligne (taille de grain, shuffle, keep,
+reverse, gain, fade, intensity ; le warp est ignoré, trop coûteux en temps réel).
+Le mélange est local : une fenêtre glissante de LIVE_WINDOW grains reçoit en
+moyenne le même nombre d'échanges par grain que _draw_order (3 × shuffle).
+
+Passage des paramètres sans verrou : set_params() publie une LiveConfig
+immuable par simple affectation de référence ; le callback la relit à chaque
+bloc. Un changement est donc audible dès le bloc suivant : le gain est
+réappliqué au grain en cours, un nouveau découpage l'interrompt par un court
+fondu, les autres paramètres valent à partir du grain suivant.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from engine import apply_fade, apply_gain_db, gain_bounds, grain_bounds_samples, sample_gain_db_array
+from presets import Params
+
+# Taille de bloc du stream (échantillons) : latence ~23 ms à 44.1 kHz
+DEFAULT_LIVE_BLOCK = 1024
+
+# Nombre de grains à venir sur lesquels porte le mélange
+LIVE_WINDOW = 32
+
+# Fondu de sortie du grain interrompu par un changement de paramètres
+LIVE_SWITCH_FADE = 256
+
+
+@dataclass(frozen=True)
+class LiveConfig:
+    """Instantané immuable des paramètres utiles au callback."""
+    seed: int
+    min_s: int
+    max_s: int
+    shuffle_amount: float
+    keep_ratio: float
+    p_reverse: float
+    gain_db_min: float
+    gain_db_max: float
+    intensity: float
+
+    @staticmethod
+    def from_params(params: Params, sr: int) -> "LiveConfig":
+        intensity = float(np.clip(params.intensity, 0.0, 2.0))
+        reverse_prob = float(np.clip(params.reverse_prob, 0.0, 1.0))
+        min_s, max_s = grain_bounds_samples(params, sr)
+        g_min, g_max = gain_bounds(params)
+        return LiveConfig(
+            seed=int(params.seed),
+            min_s=int(min_s),
+            max_s=int(max_s),
+            shuffle_amount=float(np.clip(params.shuffle_amount, 0.0, 1.0)),
+            keep_ratio=float(np.clip(params.keep_original_ratio, 0.0, 1.0)),
+            p_reverse=float(np.clip(reverse_prob * intensity, 0.0, 1.0)),
+            gain_db_min=g_min,
+            gain_db_max=g_max,
+            intensity=intensity,
+        )
+
+    def same_slicing(self, other: "LiveConfig") -> bool:
+        return (self.min_s, self.max_s, self.keep_ratio) == (other.min_s, other.max_s, other.keep_ratio)
+
+    def same_gain(self, other: "LiveConfig") -> bool:
+        return (self.gain_db_min, self.gain_db_max, self.intensity) == (
+            other.gain_db_min, other.gain_db_max, other.intensity
+        )
+
+
+class LiveGranulator:
+    """
+    Générateur de grains en flux continu (source parcourue en boucle).
+    fill() est appelé depuis le thread audio, set_params() depuis n'importe quel thread.
+    """
+
+    def __init__(self, source: np.ndarray, sr: int, params: Params) -> None:
+        if source.ndim != 1:
+            raise ValueError("Le moteur attend un audio mono (tableau 1D).")
+        self.source = np.ascontiguousarray(source, dtype=np.float32)
+        self.sr = int(sr)
+
+        self._config = LiveConfig.from_params(params, self.sr)
+        self._active: LiveConfig | None = None
+        self._rng = np.random.default_rng(self._config.seed)
+
+        self._head = 0                            # prochain échantillon source à découper
+        self._window: list[tuple[int, int, bool]] = []  # (start, length, keep)
+        self._grain = np.zeros(0, dtype=np.float32)
+        self._grain_pos = 0
+        self._grain_src: tuple[np.ndarray, float] | None = None  # (segment avant gain, tirage u)
+
+    # ---------- côté UI ----------
+
+    def set_params(self, params: Params) -> None:
+        """Publie de nouveaux paramètres (affectation atomique, pas de verrou)."""
+        self._config = LiveConfig.from_params(params, self.sr)
+
+    # ---------- côté audio ----------
+
+    def fill(self, out: np.ndarray) -> None:
+        """Remplit `out` (1D float32) avec la suite du flux granulaire."""
+        if len(self.source) == 0:
+            out[:] = 0.0
+            return
+
+        cfg = self._config  # une seule lecture par bloc
+        if cfg is not self._active:
+            self._switch(cfg)
+
+        pos = 0
+        n = len(out)
+        while pos < n:
+            if self._grain_pos >= len(self._grain):
+                self._next_grain(cfg)
+            k = min(n - pos, len(self._grain) - self._grain_pos)
+            out[pos:pos + k] = self._grain[self._grain_pos:self._grain_pos + k]
+            pos += k
+            self._grain_pos += k
+
+    def _switch(self, cfg: LiveConfig) -> None:
+        prev = self._active
+        self._active = cfg
+        if prev is None:
+            return
+
+        if cfg.seed != prev.seed:
+            self._rng = np.random.default_rng(cfg.seed)
+        if not cfg.same_slicing(prev):
+            # Redécoupe à partir du prochain grain de la fenêtre
+            if self._window:
+                self._head = self._window[0][0]
+            self._window.clear()
+
+            # Grain en cours : raccourci à un fondu de sortie
+            rest = len(self._grain) - self._grain_pos
+            if rest > LIVE_SWITCH_FADE:
+                tail = self._grain[self._grain_pos:self._grain_pos + LIVE_SWITCH_FADE].copy()
+                tail *= np.linspace(1.0, 0.0, LIVE_SWITCH_FADE, dtype=np.float32)
+                self._grain = tail
+                self._grain_pos = 0
+                self._grain_src = None
+        elif not cfg.same_gain(prev) and self._grain_src is not None:
+            # Grain en cours : même tirage u, nouvelles bornes de gain ; la lecture continue
+            seg, u = self._grain_src
+            self._grain = self._shape_grain(seg, u, cfg)
+
+    def _refill(self, cfg: LiveConfig) -> None:
+        n = len(self.source)
+        while len(self._window) < LIVE_WINDOW:
+            length = int(self._rng.integers(cfg.min_s, cfg.max_s + 1))
+            length = max(1, min(length, n - self._head))
+            keep = bool(self._rng.random() < cfg.keep_ratio)
+            self._window.append((self._head, length, keep))
+            self._head += length
+            if self._head >= n:
+                self._head = 0
+
+    def _shuffle_step(self, cfg: LiveConfig) -> None:
+        """Échanges aléatoires dans la fenêtre (3 × shuffle par grain émis, en moyenne)."""
+        if cfg.shuffle_amount <= 0.0:
+            return
+        expected = 3.0 * cfg.shuffle_amount
+        swaps = int(expected) + int(self._rng.random() < (expected - int(expected)))
+        w = self._window
+        size = len(w)
+        for a, b in self._rng.integers(0, size, size=(swaps, 2)).tolist():
+            if w[a][2] or w[b][2]:
+                continue
+            w[a], w[b] = w[b], w[a]
+
+    def _next_grain(self, cfg: LiveConfig) -> None:
+        self._refill(cfg)
+        self._shuffle_step(cfg)
+        start, length, _ = self._window.pop(0)
+
+        seg = self.source[start:start + length]
+        if self._rng.random() < cfg.p_reverse:
+            seg = seg[::-1]
+        u = float(self._rng.random())  # même tirage que sample_gain_db
+        self._grain = self._shape_grain(seg, u, cfg)
+        self._grain_pos = 0
+        self._grain_src = (seg, u)
+
+    @staticmethod
+    def _shape_grain(seg: np.ndarray, u: float, cfg: LiveConfig) -> np.ndarray:
+        gain_db = float(sample_gain_db_array(u, cfg.gain_db_min, cfg.gain_db_max, cfg.intensity))
+        seg = apply_gain_db(seg, gain_db)
+        seg = apply_fade(seg, fade_samples=min(256, max(8, len(seg) // 20)))
+        return np.clip(seg, -1.0, 1.0).astype(np.float32, copy=False)
+
+
+class LivePlayer:
+    """
+    Stream de sortie persistant alimenté par un LiveGranulator.
+    Comme pour la preview, le stream est ouvert et fermé dans son propre thread
+    (arrêt demandé via Event : pas d'appel PortAudio depuis Tkinter).
+    """
+
+    def __init__(self, granulator: LiveGranulator, block_size: int = DEFAULT_LIVE_BLOCK) -> None:
+        self.granulator = granulator
+        self.block_size = int(block_size)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.error: Exception | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_params(self, params: Params) -> None:
+        self.granulator.set_params(params)
+
+    def start(self) -> None:
+        if self.active:
+            return
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = False) -> None:
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def _callback(self, outdata: np.ndarray, frames: int, _time, _status) -> None:
+        try:
+            self.granulator.fill(outdata[:, 0])
+        except Exception as e:
+            outdata.fill(0.0)
+            self.error = e
+            self._stop.set()
+
+    def _run(self) -> None:
+        try:
+            import sounddevice as sd  # import lazy (PortAudio)
+
+            with sd.OutputStream(
+                samplerate=self.granulator.sr,
+                channels=1,
+                dtype="float32",
+                blocksize=self.block_size,
+                callback=self._callback,
+            ):
+                self._stop.wait()
+        except Exception as e:
+            self.error = e
@@ -0,0 +1,63 @@
+# numba_kernels.py
+"""
+Noyaux compilés avec numba (dépendance optionnelle).
+Importé paresseusement par engine : si numba est absent ou inutilisable,
+engine retombe sur l'implémentation NumPy.
+
+cache=True : le code machine est conservé sur disque (__pycache__), seul le
+tout premier lancement paie la compilation.
+"""
+from __future__ import annotations
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)
+def assemble_kernel(source, starts, lengths, offsets, reverse, gains, fades, skip, out):
+    """
+    Écrit chaque grain (reverse + gain + fades + clip) dans `out`, grain par grain
+    (le grain reste en cache entre les trois étapes).
+
+    `gains` doit avoir le dtype de `source` (même arrondi que la voie NumPy).
+    Lignes `skip[i]` : déjà écrites dans `out` (grains warpés) ; seuls fades et clip
+    y sont appliqués. Les rampes reproduisent np.linspace(..., dtype=float32).
+    """
+    lo = np.float32(-1.0)
+    hi = np.float32(1.0)
+    for i in range(len(lengths)):
+        o = offsets[i]
+        n = lengths[i]
+        f = fades[i]
+
+        # 1) Reverse + gain (grains warpés : déjà écrits)
+        if not skip[i]:
+            s = starts[i]
+            g = gains[i]
+            if reverse[i]:
+                last = s + n - 1
+                for j in range(n):
+                    out[o + j] = source[last - j] * g
+            else:
+                for j in range(n):
+                    out[o + j] = source[s + j] * g
+
+        # 2) Fade-in / fade-out (f <= n // 2 : pas de recouvrement)
+        if f > 0:
+            div = float(max(f - 1, 1))
+            step_in = 1.0 / div
+            step_out = -1.0 / div
+            tail = o + n - f
+            for k in range(f - 1):
+                out[o + k] *= np.float32(k * step_in)
+                out[tail + k] *= np.float32(k * step_out + 1.0)
+            if f > 1:
+                out[o + f - 1] *= np.float32(1.0)
+                out[tail + f - 1] *= np.float32(0.0)
+            else:
+                out[o] *= np.float32(0.0)
+                out[tail] *= np.float32(1.0)
+
+        # 3) Clip (min/max sans branche : se vectorise)
+        for j in range(o, o + n):
+            out[j] = min(max(out[j], lo), hi)
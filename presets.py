@@ -42,6 +42,15 @@ class Params:
     # Longueur du grain conservée (recommandé)
     warp_preserve_length: bool = True
 
+    # Grains plus courts que ~46 ms : warp temporel (WSOLA) au lieu d'être ignorés
+    warp_short_grains: bool = True
+
+    # Moteur de warp : "native" (NumPy) ou "librosa" (référence, optionnel)
+    warp_backend: str = "native"
+
+    # Qualité du warp : "draft" (varispeed, previews), "standard", "high" (export)
+    warp_quality: str = "standard"
+
     def to_dict(self) -> dict[str, Any]:
         return asdict(self)
 
@@ -0,0 +1,156 @@
+# procpool.py
+"""
+Pool de processus partagé et buffers en mémoire partagée pour les rendus parallèles.
+Le pool est créé à la demande puis réutilisé (le démarrage des workers coûte cher).
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from cancel import CancelToken, ProgressCallback
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Pool de `workers` processus (recréé seulement si le nombre change).
+    L'ancien pool termine les tâches déjà soumises (un autre appelant peut
+    encore les attendre), puis ses processus s'arrêtent.
+    """
+    global _POOL, _POOL_WORKERS
+    workers = max(1, int(workers))
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False, cancel_futures=False)
+            _POOL = ProcessPoolExecutor(max_workers=workers)
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+        _POOL = None
+        _POOL_WORKERS = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def balanced_chunks(lengths: np.ndarray, n_chunks: int, longest_first: bool = False) -> list[np.ndarray]:
+    """
+    Découpe les lignes en lots consécutifs de coût (somme des longueurs) comparable.
+    `longest_first` : lignes d'abord triées par longueur décroissante ; les premiers
+    lots (soumis en premier) portent alors les tâches les plus longues.
+    """
+    lengths = np.asarray(lengths)
+    n = len(lengths)
+    if n == 0:
+        return []
+    order = np.argsort(-lengths, kind="stable") if longest_first else np.arange(n)
+    n_chunks = int(max(1, min(n_chunks, n)))
+    ends = np.cumsum(lengths[order])
+    targets = ends[-1] * np.arange(1, n_chunks) / n_chunks
+    cuts = np.unique(np.searchsorted(ends, targets, side="left") + 1)
+    bounds = [0] + [int(c) for c in cuts if 0 < c < n] + [n]
+    return [order[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def run_chunks(
+    workers: int,
+    fn: Callable[..., Any],
+    jobs: Sequence[tuple],
+    sizes: Sequence[int],
+    stage: str,
+    cancel: CancelToken | None = None,
+    progress: ProgressCallback | None = None,
+) -> list[Any]:
+    """
+    Exécute fn(*job) pour chaque lot sur le pool partagé (soumis dans l'ordre)
+    et renvoie les résultats dans l'ordre des lots. Attente par lot terminé :
+    `cancel` vérifié toutes les 0.1 s (lots en attente annulés, RenderCancelled
+    levée), `progress(stage, lignes faites, total)` notifié, erreurs des workers
+    remontées. `sizes` : nombre de lignes de chaque lot.
+    """
+    pool = get_pool(workers)
+    futures = [pool.submit(fn, *job) for job in jobs]
+    index = {f: i for i, f in enumerate(futures)}
+    total = int(sum(sizes))
+    pending = set(futures)
+    done_rows = 0
+    while pending:
+        if cancel is not None and cancel.cancelled:
+            for f in pending:
+                f.cancel()
+            wait(pending)
+            cancel.raise_if_cancelled()
+        finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+        for f in finished:
+            f.result()  # remonte les erreurs des workers
+            done_rows += int(sizes[index[f]])
+        if finished and progress is not None:
+            progress(stage, done_rows, total)
+    return [f.result() for f in futures]
+
+
+class SharedArray:
+    """
+    Copie un tableau en mémoire partagée, le temps d'un bloc `with`.
+    Les workers y accèdent sans sérialisation via attach_shared(spec).
+    """
+
+    def __init__(self, array: np.ndarray) -> None:
+        array = np.ascontiguousarray(array)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)
+        view[...] = array
+        del view
+        self.spec = (self._shm.name, array.shape, array.dtype.str)
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+
+def attach_shared(spec: tuple) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    """
+    Côté worker : ouvre le buffer décrit par `spec` (voir SharedArray).
+    L'appelant doit relâcher le tableau puis appeler shm.close().
+    """
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def call_with_shared(spec: tuple, fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Côté worker : renvoie fn(tableau partagé, *args), le buffer décrit par `spec`
+    étant ouvert le temps de l'appel. Le résultat ne doit pas en être une vue.
+    """
+    shm, array = attach_shared(spec)
+    try:
+        return fn(array, *args)
+    finally:
+        # Aucune vue ne doit survivre au close()
+        del array
+        shm.close()
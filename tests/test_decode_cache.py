@@ -0,0 +1,36 @@
+# test_decode_cache.py
+"""
+Cache de décodage : un fichier déjà décodé se recharge sans ffmpeg.
+"""
+import numpy as np
+import pytest
+
+import audio_io
+from audio_io import DecodeCache, load_audio
+
+
+@pytest.fixture
+def no_ffmpeg(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(audio_io, "find_tool", lambda _name: None)
+    monkeypatch.setattr(audio_io, "_FFMPEG_FOUND", False)
+
+
+@pytest.mark.parametrize("settings", ["ffmpeg-f32le-mono", "pydub-mono"])
+def test_cached_file_loads_without_ffmpeg(tmp_path, no_ffmpeg, settings: str) -> None:
+    src = tmp_path / "song.mp3"
+    src.write_bytes(b"pas vraiment du mp3")
+    cache = DecodeCache(str(tmp_path / "cache"))
+    audio = np.linspace(-1.0, 1.0, 1000, dtype=np.float32)
+    cache.put(str(src), settings, audio, 44100)
+
+    out, sr = load_audio(str(src), cache=cache)
+    assert sr == 44100
+    np.testing.assert_array_equal(out, audio)
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_miss_still_requires_ffmpeg(tmp_path, no_ffmpeg) -> None:
+    src = tmp_path / "song.mp3"
+    src.write_bytes(b"pas vraiment du mp3")
+    with pytest.raises(RuntimeError, match="ffmpeg introuvable"):
+        load_audio(str(src), cache=DecodeCache(str(tmp_path / "cache")))
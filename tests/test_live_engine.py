@@ -0,0 +1,57 @@
+# test_live_engine.py
+"""
+Changements de paramètres en direct : seul un nouveau découpage interrompt le
+grain en cours ; un changement de gain lui est réappliqué sans coupure.
+"""
+import numpy as np
+import pytest
+
+from live_engine import LiveGranulator
+from presets import Params
+
+SR = 22050
+BLOCK = 512
+
+
+@pytest.fixture(scope="module")
+def source() -> np.ndarray:
+    t = np.arange(2 * SR) / SR
+    return (0.5 * np.sin(2.0 * np.pi * 330.0 * t)).astype(np.float32)
+
+
+def _blocks(gran: LiveGranulator, n: int) -> np.ndarray:
+    out = np.empty(n * BLOCK, dtype=np.float32)
+    for i in range(n):
+        gran.fill(out[i * BLOCK:(i + 1) * BLOCK])
+    return out
+
+
+def test_gain_change_applies_to_running_grain(source: np.ndarray) -> None:
+    base = Params(seed=3, grain_ms_min=300, grain_ms_max=400, gain_db_min=-6.0, gain_db_max=3.0)
+    louder = Params(seed=3, grain_ms_min=300, grain_ms_max=400, gain_db_min=-2.0, gain_db_max=6.0, intensity=1.5)
+
+    switched = LiveGranulator(source, SR, base)
+    _blocks(switched, 3)
+    switched.set_params(louder)
+
+    # Le tirage aléatoire n'est pas perturbé : même flux que si `louder` avait toujours été actif
+    direct = LiveGranulator(source, SR, louder)
+    _blocks(direct, 3)
+    assert np.array_equal(_blocks(switched, 40), _blocks(direct, 40))
+
+
+def test_only_slicing_change_cuts_running_grain(source: np.ndarray) -> None:
+    base = Params(seed=5, grain_ms_min=400, grain_ms_max=500)
+    ref = _blocks(LiveGranulator(source, SR, base), 4)
+
+    gran = LiveGranulator(source, SR, base)
+    _blocks(gran, 1)
+    gran.set_params(Params(seed=5, grain_ms_min=400, grain_ms_max=500, reverse_prob=1.0, shuffle_amount=0.0))
+    # Grain en cours (>= 400 ms) poursuivi à l'identique
+    assert np.array_equal(_blocks(gran, 3), ref[BLOCK:])
+
+    gran = LiveGranulator(source, SR, base)
+    _blocks(gran, 1)
+    gran.set_params(Params(seed=5, grain_ms_min=20, grain_ms_max=40))
+    # Nouveau découpage : le grain en cours s'arrête après le fondu de sortie
+    assert not np.array_equal(_blocks(gran, 3), ref[BLOCK:])
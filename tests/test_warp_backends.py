@@ -0,0 +1,48 @@
+# test_warp_backends.py
+"""
+Backend de warp "native" (phase vocoder groupé) comparé à la référence
+"librosa" (librosa.effects grain par grain), à tolérance près.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+
+import warp_engine as we  # noqa: E402
+from presets import Params  # noqa: E402
+
+SR = 22050
+
+
+def _grain() -> np.ndarray:
+    t = np.arange(8192) / SR
+    return (0.5 * np.sin(2.0 * np.pi * 440.0 * t) + 0.25 * np.sin(2.0 * np.pi * 660.0 * t)).astype(np.float32)
+
+
+def _spectrum(y: np.ndarray) -> np.ndarray:
+    core = y[len(y) // 8: len(y) - len(y) // 8]  # hors bords (fenêtrage ISTFT)
+    return np.abs(np.fft.rfft(core * np.hanning(len(core))))
+
+
+@pytest.mark.parametrize("preserve_length", [True, False])
+@pytest.mark.parametrize(
+    "rate, n_steps",
+    [(1.25, np.nan), (0.8, np.nan), (np.nan, 3.0), (np.nan, -4.0), (1.1, 2.0), (0.7, -5.0)],
+)
+def test_native_matches_librosa(rate: float, n_steps: float, preserve_length: bool) -> None:
+    g = _grain()
+    out = {
+        backend: we.warp_batch(
+            [g], SR, np.array([rate]), np.array([n_steps]),
+            Params(warp_amount=1.0, warp_backend=backend, warp_preserve_length=preserve_length),
+        )[0]
+        for backend in we.WARP_BACKENDS
+    }
+    native, ref = out["native"], out["librosa"]
+
+    assert len(native) == len(ref)
+    assert np.linalg.norm(native - ref) / np.linalg.norm(ref) < 0.1
+
+    a, b = _spectrum(native), _spectrum(ref)
+    assert a.argmax() == b.argmax()
+    assert np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)) > 0.99
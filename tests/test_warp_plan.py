@@ -0,0 +1,63 @@
+# test_warp_plan.py
+"""
+Tirage groupé des décisions de warp : _draw_plan doit donner les mêmes
+décisions qu'une boucle grain par grain (code d'origine de warp_grain) et
+laisser le générateur exactement dans le même état.
+"""
+import numpy as np
+import pytest
+
+from presets import Params
+from warp_engine import _draw_plan, _prob_scaled, _read_params
+
+
+def _naive_plan(rng: np.random.Generator, n: int, d, intensity: float) -> tuple[np.ndarray, np.ndarray]:
+    def biased(u: float) -> float:
+        if intensity > 1.0:
+            k = min(8.0, 1.0 + (intensity - 1.0) * 6.0)
+            u = (u ** k) if u < 0.5 else (1.0 - ((1.0 - u) ** k))
+        return u
+
+    rate = np.full(n, np.nan)
+    n_steps = np.full(n, np.nan)
+    for i in range(n):
+        if rng.random() < _prob_scaled(d.stretch_prob, d.warp_amount, intensity):
+            u = biased(float(rng.random()))
+            rate[i] = max(0.05, d.stretch_min + (d.stretch_max - d.stretch_min) * u)
+        if rng.random() < _prob_scaled(d.pitch_prob, d.warp_amount, intensity):
+            u = biased(float(rng.random()))
+            n_steps[i] = d.pitch_min_st + (d.pitch_max_st - d.pitch_min_st) * u
+    return rate, n_steps
+
+
+CASES = [
+    dict(warp_amount=1.0),
+    dict(warp_amount=0.3, intensity=1.7),
+    dict(warp_amount=1.0, warp_stretch_prob=0.0, warp_pitch_prob=1.0),
+    dict(warp_amount=1.0, warp_stretch_prob=1.0, warp_pitch_prob=0.0),
+    dict(warp_amount=0.0),
+]
+
+
+@pytest.mark.parametrize("n", [1, 7, 500])
+@pytest.mark.parametrize("overrides", CASES, ids=lambda d: ",".join(f"{k}={v}" for k, v in d.items()))
+def test_draw_plan_matches_per_grain_loop(overrides: dict, n: int) -> None:
+    params = Params(**overrides)
+    d = _read_params(params)
+    intensity = float(np.clip(params.intensity, 0.0, 2.0))
+
+    rng_naive = np.random.default_rng(11)
+    rate_ref, steps_ref = _naive_plan(rng_naive, n, d, intensity)
+
+    rng = np.random.default_rng(11)
+    rate, n_steps, draws = _draw_plan(rng, n, d, intensity)
+
+    np.testing.assert_array_equal(np.isnan(rate), np.isnan(rate_ref))
+    np.testing.assert_array_equal(np.isnan(n_steps), np.isnan(steps_ref))
+    np.testing.assert_allclose(rate, rate_ref, rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(n_steps, steps_ref, rtol=1e-12, atol=1e-12, equal_nan=True)
+
+    # Flux du RNG inchangé : même état, donc mêmes tirages pour la suite du rendu
+    assert rng.bit_generator.state == rng_naive.bit_generator.state
+    assert draws == 2 * n + int(np.sum(~np.isnan(rate))) + int(np.sum(~np.isnan(n_steps)))
+    assert rng.random() == rng_naive.random()
@@ -22,8 +22,17 @@ import numpy as np
 import sounddevice as sd
 
 from presets import Params, save_preset, load_preset
-from audio_io import load_audio, export_wav, get_ffmpeg_status_short
-from engine import render
+from audio_io import (
+    DecodeCache,
+    WaveformPeaks,
+    load_audio,
+    export_wav,
+    get_ffmpeg_diagnostics,
+    get_ffmpeg_status_short,
+)
+from engine import RenderPipeline, warm_up
+from cancel import CancelToken, RenderCancelled
+from live_engine import LiveGranulator, LivePlayer
 
 APP_NAME = "Warpocalypse"
 APP_VERSION = "1.1.12"
@@ -384,10 +393,23 @@ class WarpocalypseApp:
         self.src_path: str | None = None
         self.src_audio: np.ndarray | None = None
         self.src_sr: int | None = None
+        self.src_peaks: WaveformPeaks | None = None
 
         self.out_audio: np.ndarray | None = None
         self.out_sr: int | None = None
         self.out_segments: int = 0
+        self.out_peaks: WaveformPeaks | None = None
+
+        # Rendu incrémental : les étapes inchangées (découpage, warp) restent en cache
+        self._pipeline = RenderPipeline()
+        # Formats compressés déjà décodés : relus depuis le cache disque
+        self._decode_cache = DecodeCache()
+        # Rendu en cours : jeton d'annulation + génération (les rendus remplacés sont ignorés)
+        self._render_token: CancelToken | None = None
+        self._render_gen = 0
+        # Chargement en cours (thread) : même principe, un nouveau fichier remplace le précédent
+        self._load_token: CancelToken | None = None
+        self._load_gen = 0
 
         self._play_lock = threading.Lock()
         self._is_playing = False
@@ -395,6 +417,14 @@ class WarpocalypseApp:
         self._stop_request = threading.Event()
         self._play_thread: threading.Thread | None = None
 
+        # Lecture live : grains générés dans le callback audio
+        self._live: LivePlayer | None = None
+        # Écriture groupée des variables (preset) : callbacks de trace suspendus
+        self._pushing_params = False
+
+        # Warm-up du moteur (imports lourds, JIT) en tâche de fond
+        self._warm_thread: threading.Thread | None = None
+
         # --- AIDE overlay (affiché au démarrage) ---
         self.var_show_help = tk.BooleanVar(value=True)
         self._help_text_widget: tk.Text | None = None
@@ -419,6 +449,7 @@ class WarpocalypseApp:
         self._load_splash_image()
         self._render_help_overlay()
         self._update_help_visibility()
+        self._start_warm_up()
 
     def _choose_random_theme(self) -> None:
         names = list(THEMES.keys())
@@ -532,8 +563,15 @@ class WarpocalypseApp:
             frm_diag,
             text=get_ffmpeg_status_short(),
             style="Panel.TLabel",
+            cursor="hand2",
         )
         self.lbl_ffmpeg.grid(row=0, column=0, sticky="w")
+        # Clic : nouvelle recherche de ffmpeg / ffprobe + diagnostic détaillé
+        self.lbl_ffmpeg.bind("<Button-1>", lambda _e: self._on_ffmpeg_diagnostics())
+
+        # Statut du moteur (warm-up au démarrage)
+        self.lbl_engine = ttk.Label(frm_diag, text="", style="Panel.TLabel")
+        self.lbl_engine.grid(row=0, column=1, sticky="w", padx=(16, 0))
 
         # Thème à droite
         frm_theme = ttk.Frame(topbar, style="Panel.TFrame")
@@ -622,8 +660,11 @@ class WarpocalypseApp:
         act2.grid(row=19, column=0, sticky="ew", pady=(6, 0))
         act2.columnconfigure(0, weight=1)
         act2.columnconfigure(1, weight=1)
+        act2.columnconfigure(2, weight=1)
         ttk.Button(act2, text="Preview", command=self._on_preview).grid(row=0, column=0, sticky="ew", padx=(0, 6))
-        ttk.Button(act2, text="Stop", command=self._on_stop).grid(row=0, column=1, sticky="ew")        # Mode Loop (case à cocher) - même largeur que Export
+        self.btn_live = ttk.Button(act2, text="Live", command=self._on_live)
+        self.btn_live.grid(row=0, column=1, sticky="ew", padx=(0, 6))
+        ttk.Button(act2, text="Stop", command=self._on_stop).grid(row=0, column=2, sticky="ew")        # Mode Loop (case à cocher) - même largeur que Export
         self.chk_loop_mode = ttk.Checkbutton(
             left,
             text="Mode Loop",
@@ -776,6 +817,16 @@ class WarpocalypseApp:
         k_prob.grid(row=0, column=3, sticky="n", padx=8)
         self._knob_widgets.append(k_prob)
 
+        # Tout changement de paramètre annule un rendu devenu obsolète
+        for var in (
+            self.var_seed, self.var_grain_min, self.var_grain_max,
+            self.var_shuffle, self.var_keep, self.var_rev,
+            self.var_gain_min, self.var_gain_max, self.var_intensity,
+            self.var_warp_amount, self.var_warp_stretch_range,
+            self.var_warp_pitch_range, self.var_warp_prob,
+        ):
+            var.trace_add("write", self._on_param_changed)
+
         # Applique le thème courant
         self._apply_theme(str(self.var_theme.get()))
         # Afficher l'aide au démarrage (checkbox cochée par défaut)
@@ -814,6 +865,32 @@ class WarpocalypseApp:
         # Fallback (chemin attendu en dev)
         return os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 
+    def _start_warm_up(self) -> None:
+        """Lance warm_up() dans un thread : le premier rendu avec warp ne fige plus l'UI."""
+        self.lbl_engine.configure(text="Moteur : préparation…")
+        params = Params.from_dict(self.params.to_dict())
+
+        def _worker() -> None:
+            try:
+                warm_up(params)
+                self.root.after(0, lambda: self._on_warm_up_done(None))
+            except Exception as e:
+                self.root.after(0, lambda: self._on_warm_up_done(e))
+
+        self._warm_thread = threading.Thread(target=_worker, daemon=True)
+        self._warm_thread.start()
+
+    def _on_warm_up_done(self, error: Exception | None) -> None:
+        self._warm_thread = None
+        try:
+            if error is None:
+                self.lbl_engine.configure(text="Moteur : prêt")
+            else:
+                # Sans conséquence tant que le warp reste désactivé (erreur détaillée au rendu)
+                self.lbl_engine.configure(text="Moteur : warp indisponible")
+        except Exception:
+            pass
+
     def _set_startup_status(self, msg: str) -> None:
         """Affiche un statut de démarrage (utile en build)."""
         try:
@@ -1113,22 +1190,29 @@ class WarpocalypseApp:
             pass
 
     def _push_params_to_ui(self) -> None:
-        self.var_seed.set(int(self.params.seed))
-        self.var_grain_min.set(int(self.params.grain_ms_min))
-        self.var_grain_max.set(int(self.params.grain_ms_max))
-        self.var_shuffle.set(float(self.params.shuffle_amount))
-        self.var_keep.set(float(self.params.keep_original_ratio))
-        self.var_rev.set(float(self.params.reverse_prob))
-        self.var_gain_min.set(float(self.params.gain_db_min))
-        self.var_gain_max.set(float(self.params.gain_db_max))
-        self.var_intensity.set(float(self.params.intensity))
-
+        # Sans garde, la première écriture (seed) relirait en live toutes les
+        # autres variables, encore aux anciennes valeurs, dans self.params
+        self._pushing_params = True
         try:
-            self.var_warp_amount.set(float(self.params.warp_amount))
-            self.var_warp_prob.set(float((self.params.warp_stretch_prob + self.params.warp_pitch_prob) / 2.0))
-            self._push_warp_ranges_to_ui()
-        except Exception:
-            pass
+            self.var_seed.set(int(self.params.seed))
+            self.var_grain_min.set(int(self.params.grain_ms_min))
+            self.var_grain_max.set(int(self.params.grain_ms_max))
+            self.var_shuffle.set(float(self.params.shuffle_amount))
+            self.var_keep.set(float(self.params.keep_original_ratio))
+            self.var_rev.set(float(self.params.reverse_prob))
+            self.var_gain_min.set(float(self.params.gain_db_min))
+            self.var_gain_max.set(float(self.params.gain_db_max))
+            self.var_intensity.set(float(self.params.intensity))
+
+            try:
+                self.var_warp_amount.set(float(self.params.warp_amount))
+                self.var_warp_prob.set(float((self.params.warp_stretch_prob + self.params.warp_pitch_prob) / 2.0))
+                self._push_warp_ranges_to_ui()
+            except Exception:
+                pass
+        finally:
+            self._pushing_params = False
+        self._on_param_changed()  # une seule synchronisation, variables complètes
 
     def _push_warp_ranges_to_ui(self) -> None:
         # Stretch
@@ -1162,19 +1246,72 @@ class WarpocalypseApp:
         if not path:
             return
 
+        # Un chargement encore en cours est remplacé par celui-ci
+        if self._load_token is not None:
+            self._load_token.cancel()
+        self._load_gen += 1
+        gen = self._load_gen
+        token = CancelToken()
+        self._load_token = token
+        self.lbl_info.configure(text=f"Chargement : {os.path.basename(path)}…")
+
+        def _progress(_stage: str, done: int, total: int) -> None:
+            self.root.after(0, lambda: self._on_load_progress(gen, path, done, total))
+
+        # Worker (thread) : décodage par blocs, forme d'onde résumée au fil des blocs
+        def _worker() -> None:
+            try:
+                peaks = WaveformPeaks()
+                audio, sr = load_audio(
+                    path, cache=self._decode_cache, cancel=token, progress=_progress, peaks=peaks
+                )
+                # Caches de l'ancienne source libérés ici, hors thread Tk (le pipeline
+                # repartirait de toute façon de zéro : la source change d'identité)
+                token.raise_if_cancelled()
+                self._pipeline.clear()
+                self.root.after(0, lambda: self._on_load_done(gen, path, audio, sr, peaks))
+            except RenderCancelled:
+                pass  # remplacé par un autre chargement
+            except Exception as e:
+                self.root.after(0, lambda err=e: self._on_load_failed(gen, err))
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def _on_load_progress(self, gen: int, path: str, done: int, total: int) -> None:
+        if gen != self._load_gen or total <= 0:
+            return
         try:
-            audio, sr = load_audio(path)
-        except Exception as e:
-            messagebox.showerror("Erreur", f"Impossible de charger ce fichier.\n\nDétail : {e}")
+            self.lbl_info.configure(text=f"Chargement : {os.path.basename(path)}… {100 * done // total}%")
+        except Exception:
+            pass
+
+    def _on_load_failed(self, gen: int, e: Exception) -> None:
+        if gen != self._load_gen:
             return
+        self._load_token = None
+        self.lbl_info.configure(text="Chargement échoué.")
+        messagebox.showerror("Erreur", f"Impossible de charger ce fichier.\n\nDétail : {e}")
+
+    def _on_load_done(self, gen: int, path: str, audio: np.ndarray, sr: int, peaks: WaveformPeaks) -> None:
+        if gen != self._load_gen:
+            return
+        self._load_token = None
+
+        # Nouvelle source : un rendu en cours serait périmé
+        if self._cancel_render():
+            self._render_gen += 1
+            self._reset_render_button()
+        self._stop_live()
 
         self.src_path = path
         self.src_audio = audio
         self.src_sr = sr
+        self.src_peaks = peaks
 
         self.out_audio = None
         self.out_sr = None
         self.out_segments = 0
+        self.out_peaks = None
 
         self.lbl_file.configure(text=os.path.basename(path))
         self.lbl_info.configure(text=f"Chargé : {os.path.basename(path)} — {sr} Hz — {len(audio)/sr:.2f} s (mono)")
@@ -1204,82 +1341,142 @@ class WarpocalypseApp:
             messagebox.showinfo("Information", "Veuillez charger un fichier audio avant de rendre.")
             return
 
-        # Évite les doubles clics
-        try:
-            if getattr(self, "_render_busy", False):
-                return
-        except Exception:
-            pass
-
-        self._render_busy = True
-
-        # UI: désactiver le bouton pendant le rendu
-        try:
-            self.btn_render.configure(text="Rendu…", state="disabled")
-        except Exception:
-            pass
+        # Un nouveau rendu remplace le précédent : celui-ci est annulé
+        self._cancel_render()
 
         # Récupère les paramètres dans le thread UI (safe)
         self._sync_params_from_ui()
 
-        # Si Warp activé : vérifier dépendances AVANT de lancer le thread (safe pour messagebox)
-        if float(np.clip(getattr(self.params, "warp_amount", 0.0), 0.0, 1.0)) > 0.0:
+        # Si Warp activé : vérifier dépendances AVANT de lancer le thread (safe pour messagebox).
+        # Warm-up encore en cours : pas de vérification ici (l'import bloquerait l'UI
+        # jusqu'à sa fin) ; une dépendance manquante fera échouer le rendu, avec détail.
+        warming = self._warm_thread is not None and self._warm_thread.is_alive()
+        if not warming and float(np.clip(getattr(self.params, "warp_amount", 0.0), 0.0, 1.0)) > 0.0:
             try:
                 from warp_engine import ensure_warp_deps_available
-                ensure_warp_deps_available()
+                ensure_warp_deps_available(self.params)
             except Exception as e:
-                self._render_busy = False
-                try:
-                    self.btn_render.configure(text="Rendre", state="normal")
-                except Exception:
-                    pass
                 messagebox.showerror("Warp", f"Warp activé, mais dépendances manquantes ou invalides.\n\nDétail : {e}")
                 return
 
+        self._render_gen += 1
+        gen = self._render_gen
+        token = CancelToken()
+        self._render_token = token
+
+        # UI: le bouton reste actif (un nouveau clic relance avec les réglages courants)
+        try:
+            self.btn_render.configure(text="Rendu…")
+        except Exception:
+            pass
+
+        def _progress(stage: str, done: int, total: int) -> None:
+            self.root.after(0, lambda: self._on_render_progress(gen, stage, done, total))
+
         # Worker (thread)
         def _worker(audio: np.ndarray, sr: int, params: Params) -> None:
             try:
-                res = render(audio, sr, params)
+                res = self._pipeline.render(audio, sr, params, cancel=token, progress=_progress)
+                peaks = WaveformPeaks.from_array(res.audio)
                 # Retour UI thread
-                self.root.after(0, lambda: self._on_render_done(res))
+                self.root.after(0, lambda: self._on_render_done(gen, res, params, peaks))
+            except RenderCancelled:
+                self.root.after(0, lambda: self._on_render_cancelled(gen))
             except Exception as e:
-                self.root.after(0, lambda: self._on_render_failed(e))
+                self.root.after(0, lambda: self._on_render_failed(gen, e))
 
+        # Copie des paramètres : l'UI peut les modifier pendant le rendu
         threading.Thread(
             target=_worker,
-            args=(self.src_audio, self.src_sr, self.params),
+            args=(self.src_audio, self.src_sr, Params.from_dict(self.params.to_dict())),
             daemon=True,
         ).start()
 
-    def _on_render_done(self, res) -> None:
-        # res vient de engine.render()
+    def _cancel_render(self) -> bool:
+        """Annule le rendu en cours (s'il y en a un). Retourne True si un rendu a été annulé."""
+        token = self._render_token
+        self._render_token = None
+        if token is None or token.cancelled:
+            return False
+        token.cancel()
+        return True
+
+    def _on_param_changed(self, *_args: object) -> None:
+        if self._pushing_params:
+            return
+
+        # Lecture live : nouveaux paramètres audibles dès le bloc audio suivant
+        if self._live is not None and self._live.active:
+            try:
+                self._sync_params_from_ui()
+                self._live.set_params(Params.from_dict(self.params.to_dict()))
+            except Exception:
+                pass  # champ en cours de saisie (valeur invalide)
+
+        # Paramètres modifiés pendant un rendu : le résultat serait périmé
+        if self._cancel_render():
+            self._render_gen += 1
+            self._reset_render_button()
+            try:
+                self.lbl_info.configure(text="Rendu annulé : paramètres modifiés.")
+            except Exception:
+                pass
+
+    def _on_render_progress(self, gen: int, stage: str, done: int, total: int) -> None:
+        if gen != self._render_gen or total <= 0:
+            return
+        label = {"warp": "warp", "assemble": "assemblage"}.get(stage, stage)
+        try:
+            self.btn_render.configure(text=f"Rendu… {100 * done // total}%")
+            self.lbl_info.configure(text=f"Rendu en cours — {label} : {done}/{total} grains")
+        except Exception:
+            pass
+
+    def _reset_render_button(self) -> None:
+        try:
+            self.btn_render.configure(text="Rendre", state="normal")
+        except Exception:
+            pass
+
+    def _on_render_done(self, gen: int, res, params: Params, peaks: WaveformPeaks | None = None) -> None:
+        # res vient de RenderPipeline.render() ; rendus remplacés entre-temps : ignorés
+        if gen != self._render_gen:
+            return
         try:
+            self._render_token = None
             self.out_audio = res.audio
             self.out_sr = self.src_sr
             self.out_segments = res.segments_count
+            self.out_peaks = peaks
 
+            calc = ""
+            if getattr(res, "stats", None) is not None:
+                calc = f" — calcul: {res.stats.wall_seconds:.2f} s"
             self.lbl_info.configure(
-                text=f"Rendu prêt — segments: {self.out_segments} — durée: {len(self.out_audio)/self.out_sr:.2f} s — seed: {self.params.seed}"
+                text=f"Rendu prêt — segments: {self.out_segments} — durée: {len(self.out_audio)/self.out_sr:.2f} s — seed: {params.seed}{calc}"
             )
             self._redraw_waveform()
         finally:
-            self._render_busy = False
-            try:
-                self.btn_render.configure(text="Rendre", state="normal")
-            except Exception:
-                pass
+            self._reset_render_button()
+
+    def _on_render_cancelled(self, gen: int) -> None:
+        if gen != self._render_gen:
+            return
+        self._render_token = None
+        self._reset_render_button()
 
-    def _on_render_failed(self, e: Exception) -> None:
+    def _on_render_failed(self, gen: int, e: Exception) -> None:
+        if gen != self._render_gen:
+            return
         try:
+            self._render_token = None
             messagebox.showerror("Erreur", f"Le rendu a échoué.\n\nDétail : {e}")
         finally:
-            self._render_busy = False
-            try:
-                self.btn_render.configure(text="Rendre", state="normal")
-            except Exception:
-                pass
+            self._reset_render_button()
 
     def _on_preview(self) -> None:
+        if self._live is not None and self._live.active:
+            return
         audio, sr = self._get_preview_buffer()
         if audio is None or sr is None:
             return
@@ -1342,8 +1539,49 @@ class WarpocalypseApp:
     def _on_stop(self) -> None:
         # Ne pas appeler sd.stop() depuis Tkinter (segfault observé)
         self._stop_request.set()
+        self._stop_live()
         self._log("Stop: arrêt demandé.")
 
+    def _on_live(self) -> None:
+        if self._live is not None and self._live.active:
+            self._stop_live()
+            return
+        if self.src_audio is None or self.src_sr is None:
+            messagebox.showinfo("Information", "Veuillez charger un fichier audio avant la lecture live.")
+            return
+        with self._play_lock:
+            if self._is_playing:
+                return
+
+        self._sync_params_from_ui()
+        src = self.src_audio
+        if bool(self.var_loop_mode.get()) and self._loop_has_valid_selection():
+            try:
+                src = self._apply_loop_to_buffer(src, self.src_sr)
+            except Exception:
+                pass
+
+        granulator = LiveGranulator(src, self.src_sr, Params.from_dict(self.params.to_dict()))
+        self._live = LivePlayer(granulator)
+        self._live.start()
+        self.btn_live.configure(text="Live ■")
+        self.root.after(200, self._poll_live)
+
+    def _stop_live(self) -> None:
+        # Arrêt demandé via Event : le stream est fermé dans son propre thread
+        if self._live is not None:
+            self._live.stop()
+
+    def _poll_live(self) -> None:
+        live = self._live
+        if live is not None and live.active:
+            self.root.after(200, self._poll_live)
+            return
+        self.btn_live.configure(text="Live")
+        if live is not None and live.error is not None:
+            messagebox.showerror("Erreur", f"Lecture live impossible.\n\nDétail : {live.error}")
+        self._live = None
+
     def _get_preview_buffer(self, raw: bool = False) -> tuple[np.ndarray | None, int | None]:
         if self.src_audio is None or self.src_sr is None:
             messagebox.showinfo("Information", "Veuillez charger un fichier audio avant de pré-écouter.")
@@ -1367,6 +1605,12 @@ class WarpocalypseApp:
         return buf, sr
 
 
+    def _on_ffmpeg_diagnostics(self) -> None:
+        # Oublie les chemins mémorisés (ffmpeg installé / déplacé depuis)
+        text = get_ffmpeg_diagnostics(rescan=True)
+        self.lbl_ffmpeg.configure(text=get_ffmpeg_status_short())
+        messagebox.showinfo("Diagnostics ffmpeg", text)
+
     def _on_export(self) -> None:
         if self.out_audio is None or self.out_sr is None:
             messagebox.showinfo("Information", "Veuillez rendre (apply) avant d’exporter.")
@@ -1476,12 +1720,15 @@ class WarpocalypseApp:
 
         audio = None
         sr = None
+        peaks = None
         if self.out_audio is not None and self.out_sr is not None:
             audio = self.out_audio
             sr = self.out_sr
+            peaks = self.out_peaks
         elif self.src_audio is not None and self.src_sr is not None:
             audio = self.src_audio
             sr = self.src_sr
+            peaks = self.src_peaks
 
         if audio is None or sr is None or len(audio) == 0:
             self._draw_center_text("Aucun signal")
@@ -1491,18 +1738,20 @@ class WarpocalypseApp:
         h = max(1, self.canvas.winfo_height())
 
         n = len(audio)
-        step = max(1, n // w)
-        reduced = audio[::step]
+        if peaks is None:
+            peaks = WaveformPeaks.from_array(audio)
+        mins, maxs = peaks.columns(w)
 
         mid = h // 2
         scale = (h * 0.45)
 
-        x_prev = 0
-        y_prev = mid
-        for x, v in enumerate(reduced[:w]):
-            y = int(mid - float(v) * scale)
-            self.canvas.create_line(x_prev, y_prev, x, y, fill=self._col_accent)
-            x_prev, y_prev = x, y
+        # Une barre min/max par colonne (résumé calculé au chargement / rendu)
+        cols = len(mins)
+        for i in range(cols):
+            x = (i * w) // cols
+            y_top = int(mid - float(maxs[i]) * scale)
+            y_bot = int(mid - float(mins[i]) * scale)
+            self.canvas.create_line(x, y_top, x, y_bot + 1, fill=self._col_accent)
 
         dur = n / sr
         self.canvas.create_text(10, 10, anchor="nw", fill="white", text=f"{dur:.2f}s — {sr}Hz")
@@ -1,11 +1,19 @@
 # warp_engine.py
 from __future__ import annotations
 
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Hashable, Optional, Sequence
 
 import numpy as np
 
+from bytecache import ByteLRUCache
+from cancel import CancelToken, ProgressCallback, iter_batches
+
 
 # ----------------------------- config ---------------------------------
 
@@ -29,18 +37,102 @@ class WarpDefaults:
     # Préserver la longueur du grain d'origine (recommandé)
     preserve_length: bool = True
 
-    # Sécurité: en dessous de ce nombre d'échantillons, pas de warp
+    # En dessous de ce nombre d'échantillons, pas de phase vocoder (STFT instable)
     min_samples: int = 2048
 
+    # Grains courts (short_min_samples <= longueur < min_samples) : warp dans le
+    # domaine temporel (WSOLA + rééchantillonnage) ; sinon laissés intacts
+    short_grains: bool = True
+    short_min_samples: int = 256
+
+    # Moteur : voir WARP_BACKENDS
+    backend: str = "native"
+
+    # Qualité : voir WARP_QUALITIES
+    quality: str = "standard"
+
+
+# Moteurs de warp :
+#   - "native"  : phase vocoder NumPy groupé (défaut, aucune dépendance lourde)
+#   - "librosa" : librosa.effects grain par grain (référence pour les comparaisons A/B)
+WARP_BACKENDS = ("native", "librosa")
+
+# Qualités de warp (mêmes décisions, donc mêmes tirages, quel que soit le niveau) :
+#   - "draft"    : varispeed façon bande (un rééchantillonnage cubique par grain,
+#                  vitesse rate * 2^(n/12) : durée et hauteur liées), pour les previews
+#   - "standard" : phase vocoder (défaut)
+#   - "high"     : phase vocoder, FFT deux fois plus longues et recouvrement 7/8
+WARP_QUALITIES = ("draft", "standard", "high")
+
+# Budget (nombre de coefficients STFT) d'un lot empilé : borne la mémoire du warp groupé
+WARP_BATCH_ELEMENTS = 1 << 22
+
+# Warp multi-processus : nombre minimal de grains pour passer par le pool,
+# lots par worker (distribués du plus long au plus court)
+WARP_PARALLEL_MIN_GRAINS = 64
+WARP_CHUNKS_PER_WORKER = 4
+
+# Tailles de FFT : bornes à 44.1 kHz (la borne haute suit le sample rate)
+WARP_N_FFT_MIN = 256
+WARP_N_FFT_MAX = 2048
+WARP_FFT_REFERENCE_SR = 44100
+
+# WSOLA (grains courts) : trame max à 44.1 kHz (au plus la moitié du grain),
+# hop = tolérance de recalage = trame / 2
+WARP_WSOLA_FRAME_MIN = 64
+WARP_WSOLA_FRAME_MAX = 512
+
+
+@dataclass(frozen=True)
+class FFTSetup:
+    """Constantes d'une taille de FFT, partagées par tous les grains (voir fft_setup)."""
+    n_fft: int
+    hop_length: int
+    window: np.ndarray        # Hann périodique (= scipy.signal.get_window("hann", n_fft))
+    window_sq: np.ndarray
+    phi_advance: np.ndarray   # avance de phase attendue par bin et par hop
+
+
+@dataclass
+class WarpPlan:
+    """
+    Décisions de warp de tous les grains, tirées en une fois (voir plan_warp).
+    NaN = opération non appliquée. Consommé tel quel par apply_plan / warp_batch.
+    """
+    rate: np.ndarray          # float64, un rate de time-stretch par grain
+    n_steps: np.ndarray       # float64, un pitch shift (demi-tons) par grain
+    settings: WarpDefaults    # paramètres de warp, lus une seule fois
+    draws: int = 0            # nombre d'uniformes consommés sur le RNG
+
+    def __len__(self) -> int:
+        return len(self.rate)
+
+    @property
+    def warped(self) -> np.ndarray:
+        """Masque des grains modifiés (stretch et/ou pitch)."""
+        return ~(np.isnan(self.rate) & np.isnan(self.n_steps))
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "grains": len(self),
+            "stretched": int(np.count_nonzero(~np.isnan(self.rate))),
+            "pitched": int(np.count_nonzero(~np.isnan(self.n_steps))),
+            "warped": int(np.count_nonzero(self.warped)),
+            "draws": self.draws,
+        }
+
 
 # ----------------------------- public API ---------------------------------
 
-def _choose_n_fft(n_samples: int, n_fft_max: int = 2048, n_fft_min: int = 256) -> int:
-    """Choisit un n_fft (puissance de 2) adapté à la longueur du signal."""
+def _choose_n_fft(n_samples: int, n_fft_max: int = WARP_N_FFT_MAX, n_fft_min: int = WARP_N_FFT_MIN) -> int:
+    """
+    Choisit un n_fft (puissance de 2) adapté à la longueur du signal : au plus la
+    moitié du grain, soit au moins 9 trames avec hop = n_fft / 4 (un grain court
+    analysé par une seule grande FFT sonne flou). 0 = grain trop court.
+    """
     if n_samples <= 0:
         return 0
-    # n_fft doit être <= n_samples pour éviter les warnings/librosa
-    n_fft = min(n_fft_max, n_samples)
+    n_fft = min(n_fft_max, n_samples // 2)
     # puissance de 2 <= n_fft
     p = 1
     while (p * 2) <= n_fft:
@@ -49,6 +141,198 @@ def _choose_n_fft(n_samples: int, n_fft_max: int = 2048, n_fft_min: int = 256) -
         return 0
     return p
 
+
+def n_fft_max_for_sr(sr: int) -> int:
+    """Borne haute de n_fft à `sr` : même durée de fenêtre qu'à 44.1 kHz (puissance de 2)."""
+    return _pow2_for_sr(WARP_N_FFT_MAX, WARP_N_FFT_MIN, sr)
+
+
+def _pow2_for_sr(size: int, size_min: int, sr: int) -> int:
+    """Puissance de 2 la plus proche de `size` (défini à 44.1 kHz) remis à l'échelle de `sr`."""
+    target = size * float(sr) / WARP_FFT_REFERENCE_SR
+    p = size_min
+    while p * 2 <= target * 1.5:
+        p *= 2
+    return p
+
+
+def fft_setup(n_fft: int, overlap: int = 4) -> FFTSetup:
+    """
+    Fenêtre, hop (n_fft / overlap) et avances de phase pour `n_fft`, calculés une
+    fois par processus (registre partagé par tous les rendus ; les plans FFT
+    eux-mêmes sont mis en cache par pocketfft). Tableaux en lecture seule.
+    """
+    key = (n_fft, overlap)
+    setup = _FFT_SETUPS.get(key)
+    if setup is None:
+        with _FFT_SETUPS_LOCK:
+            setup = _FFT_SETUPS.get(key)
+            if setup is None:
+                hop_length = max(1, n_fft // overlap)
+                window = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+                window_sq = window * window
+                phi_advance = np.linspace(0, np.pi * hop_length, n_fft // 2 + 1, dtype=np.float32)
+                for a in (window, window_sq, phi_advance):
+                    a.flags.writeable = False
+                setup = FFTSetup(n_fft, hop_length, window, window_sq, phi_advance)
+                _FFT_SETUPS[key] = setup
+    return setup
+
+
+_FFT_SETUPS: dict[tuple[int, int], FFTSetup] = {}
+_FFT_SETUPS_LOCK = threading.Lock()
+
+
+# ----------------------------- cache ---------------------------------
+
+# Budgets par défaut du cache de grains warpés (octets)
+DEFAULT_WARP_CACHE_BYTES = 256 * 1024 * 1024
+DEFAULT_WARP_SPILL_BYTES = 1024 * 1024 * 1024
+
+
+class WarpCache:
+    """
+    Cache LRU des grains warpés, borné en octets (thread-safe).
+
+    Clé : (empreinte de la source, début, longueur, rate, n_steps, sr, backend,
+    qualité, preserve_length) ; n_fft s'en déduit (longueur, sr, qualité). Un grain redemandé avec
+    la même décision n'est donc pas recalculé, quels que soient la seed, le
+    gain ou le reverse.
+
+    `spill_dir` (optionnel) : les entrées évincées de la mémoire sont écrites
+    en .npy dans ce dossier (budget `spill_bytes`, plus anciennes supprimées
+    d'abord) et relues à la demande, y compris d'une session à l'autre.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_WARP_CACHE_BYTES,
+        spill_dir: Optional[str] = None,
+        spill_bytes: int = DEFAULT_WARP_SPILL_BYTES,
+    ) -> None:
+        self.memory = ByteLRUCache(max_bytes, on_evict=self._spill if spill_dir else None)
+        self.spill_dir = spill_dir
+        self.spill_bytes = int(max(0, spill_bytes))
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+        self._disk: OrderedDict[str, int] = OrderedDict()  # nom de fichier -> taille (LRU)
+        self._disk_bytes = 0
+        self._source: tuple[Any, str] = (None, "")
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self._scan_disk()
+
+    def source_id(self, source: np.ndarray) -> str:
+        """Empreinte du contenu de la source (mémorisée pour le dernier tableau vu)."""
+        ref, sid = self._source
+        if ref is not None and ref() is source:
+            return sid
+        data = np.ascontiguousarray(source)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{data.dtype.str}:{len(data)}:".encode())
+        h.update(memoryview(data).cast("B"))
+        sid = h.hexdigest()
+        self._source = (weakref.ref(source), sid)
+        return sid
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        y = self.memory.get(key)
+        if y is None and self.spill_dir:
+            y = self._load(key)
+            if y is not None:
+                self.memory.put(key, y, y.nbytes)
+                with self._lock:
+                    self.disk_hits += 1
+        with self._lock:
+            if y is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return y
+
+    def put(self, key: Hashable, y: np.ndarray) -> None:
+        y.flags.writeable = False  # partagé entre rendus
+        self.memory.put(key, y, y.nbytes)
+
+    def clear(self, disk: bool = False) -> None:
+        self.memory.clear()
+        if disk and self.spill_dir:
+            with self._lock:
+                for name in list(self._disk):
+                    self._remove(name)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "entries": len(self.memory),
+            "bytes": self.memory.bytes_used,
+            "disk_bytes": self._disk_bytes,
+        }
+
+    # ---------- disque ----------
+
+    @staticmethod
+    def _file_name(key: Hashable) -> str:
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest() + ".npy"
+
+    def _scan_disk(self) -> None:
+        entries = []
+        for name in os.listdir(self.spill_dir):
+            if name.endswith(".npy"):
+                try:
+                    st = os.stat(os.path.join(self.spill_dir, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_bytes += size
+
+    def _spill(self, key: Hashable, y: np.ndarray) -> None:
+        name = self._file_name(key)
+        path = os.path.join(self.spill_dir, name)
+        with self._lock:
+            if name in self._disk:
+                self._disk.move_to_end(name)
+                return
+            try:
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, y)
+                os.replace(tmp, path)
+                size = os.path.getsize(path)
+            except OSError:
+                return  # disque plein / non inscriptible : entrée simplement perdue
+            self._disk[name] = size
+            self._disk_bytes += size
+            while self._disk_bytes > self.spill_bytes and self._disk:
+                self._remove(next(iter(self._disk)))
+
+    def _load(self, key: Hashable) -> Optional[np.ndarray]:
+        name = self._file_name(key)
+        with self._lock:
+            if name not in self._disk:
+                return None
+            try:
+                y = np.load(os.path.join(self.spill_dir, name))
+            except (OSError, ValueError):
+                self._remove(name)
+                return None
+            self._disk.move_to_end(name)
+        y.flags.writeable = False
+        return y
+
+    def _remove(self, name: str) -> None:
+        self._disk_bytes -= self._disk.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.spill_dir, name))
+        except OSError:
+            pass
+
 def warp_grain(
     grain: np.ndarray,
     sr: int,
@@ -70,73 +354,171 @@ def warp_grain(
     if grain.ndim != 1:
         raise ValueError("warp_grain attend un signal mono (tableau 1D).")
 
-    d = _read_params(params)
+    plan = plan_warp(np.array([len(grain)]), rng, params)
 
     # Off / trop court
-    if d.warp_amount <= 0.0 or len(grain) < d.min_samples:
+    if not plan.warped[0]:
         return grain
+    return _warp_rows([grain], sr, plan.rate, plan.n_steps, plan.settings)[0]
 
-    librosa = _import_librosa_required()
+
+def plan_warp(
+    lengths: np.ndarray,
+    rng: np.random.Generator,
+    params: object,
+) -> WarpPlan:
+    """
+    Tire les décisions de warp de tous les grains sans toucher à l'audio :
+    paramètres lus une fois, un seul tirage vectorisé pour l'ensemble des grains.
+
+    Consomme le RNG exactement comme warp_grain appelé grain par grain sur des
+    grains de mêmes longueurs (mêmes décisions pour une même seed).
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    n = len(lengths)
+    d = _read_params(params)
+    plan = WarpPlan(np.full(n, np.nan), np.full(n, np.nan), d)
+    if d.warp_amount <= 0.0 or n == 0:
+        return plan
+
+    _require_backend(d)
+    rows = np.flatnonzero(lengths >= _eligible_min(d))
+    if len(rows) == 0:
+        return plan
 
     # Intensité globale du projet (si présente) : module la tendance vers les extrêmes
-    intensity = float(np.clip(getattr(params, "intensity", 1.0), 0.0, 2.0))
+    intensity = _read_intensity(params)
+    rate, n_steps, plan.draws = _draw_plan(rng, len(rows), d, intensity)
+    plan.rate[rows] = rate
+    plan.n_steps[rows] = n_steps
+    return plan
 
-    y = grain.astype(np.float32, copy=False)
 
-    # 1) Time-stretch (probabilité + amplitude modulée)
-    if rng.random() < _prob_scaled(d.stretch_prob, d.warp_amount, intensity):
-        rate = _sample_stretch_rate(rng, d, intensity)
-        # librosa.effects.time_stretch attend rate > 0
-        try:
-            y = librosa.effects.time_stretch(y, rate=rate, n_fft=n_fft, hop_length=hop_length).astype(np.float32)
+def warp_segments(
+    segments: list[np.ndarray],
+    sr: int,
+    rng: np.random.Generator,
+    params: object,
+    cancel: Optional[CancelToken] = None,
+    progress: Optional[ProgressCallback] = None,
+    workers: Optional[int] = None,
+) -> list[np.ndarray]:
+    """
+    Applique le warp sur une liste de segments (mêmes tirages que warp_grain
+    appelé grain par grain) : plan_warp puis apply_plan.
+    """
+    if not segments:
+        return segments
+    lengths = np.fromiter((len(seg) for seg in segments), dtype=np.int64, count=len(segments))
+    plan = plan_warp(lengths, rng, params)
+    return apply_plan(segments, sr, plan, cancel=cancel, progress=progress, workers=workers)
 
-        except Exception:
-            # En cas d'échec numérique, on laisse le grain inchangé (fail-soft)
-            y = grain
 
-    # 2) Pitch shift (probabilité + amplitude modulée)
-    if rng.random() < _prob_scaled(d.pitch_prob, d.warp_amount, intensity):
-        n_steps = _sample_pitch_steps(rng, d, intensity)
-        try:
-            y = librosa.effects.pitch_shift(y, sr=sr, n_steps=n_steps, n_fft=n_fft, hop_length=hop_length).astype(np.float32)
+def apply_plan(
+    segments: list[np.ndarray],
+    sr: int,
+    plan: WarpPlan,
+    cancel: Optional[CancelToken] = None,
+    progress: Optional[ProgressCallback] = None,
+    workers: Optional[int] = None,
+) -> list[np.ndarray]:
+    """
+    Exécute un plan de warp (voir plan_warp) sur les segments correspondants,
+    traitement groupé via warp_batch.
+    `cancel` est vérifié et `progress("warp", fait, total)` notifié par lot de grains.
+    `workers` > 1 : grains répartis sur un pool de processus (voir
+    warp_batch_parallel), résultat identique.
+    """
+    if len(segments) != len(plan):
+        raise ValueError("Le plan de warp ne correspond pas au nombre de segments.")
+    d = plan.settings
+    if d.warp_amount <= 0.0:
+        return segments
 
-        except Exception:
-            y = y  # fail-soft
+    # Grains éligibles (assez longs) : passent tous par warp_batch, comme par warp_grain
+    lengths = np.fromiter((len(seg) for seg in segments), dtype=np.int64, count=len(segments))
+    rate, n_steps = plan.rate, plan.n_steps
+    out = list(segments)
+    rows = np.flatnonzero(lengths >= _eligible_min(d))
+    if workers is not None and workers > 1:
+        ys = warp_batch_parallel(
+            [segments[i] for i in rows.tolist()], sr, rate[rows], n_steps[rows], d,
+            workers, cancel=cancel, progress=progress,
+        )
+        for i, y in zip(rows.tolist(), ys):
+            out[i] = y
+        return out
+    for lo, hi in iter_batches(len(rows), "warp", cancel, progress):
+        idx = rows[lo:hi]
+        ys = warp_batch([segments[i] for i in idx.tolist()], sr, rate[idx], n_steps[idx], d)
+        for i, y in zip(idx.tolist(), ys):
+            out[i] = y
+    return out
 
-    # Option: préserver la longueur initiale (utile pour conserver le groove global)
-    if d.preserve_length:
-        y = _fit_length(y, target_len=len(grain))
 
-    return np.clip(y, -1.0, 1.0).astype(np.float32)
+def warp_batch(
+    grains: list[np.ndarray],
+    sr: int,
+    rate: np.ndarray,
+    n_steps: np.ndarray,
+    params: object,
+    cache: Optional[WarpCache] = None,
+    grain_ids: Optional[Sequence[tuple[str, int]]] = None,
+) -> list[np.ndarray]:
+    """
+    Exécute des décisions déjà tirées (voir plan_warp) sur un lot de grains : stretch puis pitch,
+    NaN = opération non appliquée.
 
-    # Garde-fou FFT : choisir une taille adaptée au grain
-    n_fft = _choose_n_fft(len(grain), n_fft_max=2048, n_fft_min=256)
-    if n_fft == 0:
-        return grain
-    hop_length = max(1, n_fft // 4)
+    Backend "native" : les grains sont regroupés par (longueur paddée, n_fft, hop) ;
+    chaque groupe passe en une fois dans STFT / phase vocoder / ISTFT sous forme
+    de tableau 2D empilé. Backend "librosa" : un appel librosa par grain.
+    Grains plus courts que min_samples (les deux backends) : WSOLA groupé puis
+    rééchantillonnage linéaire.
 
+    `cache` + `grain_ids` ((empreinte source, début) par grain, voir
+    WarpCache.source_id) : seuls les grains absents du cache sont calculés.
+    """
+    d = _read_params(params)
+    return _cached_rows(grains, sr, rate, n_steps, d, cache, grain_ids, _warp_rows)
 
 
-def warp_segments(
-    segments: list[np.ndarray],
+def warp_batch_parallel(
+    grains: list[np.ndarray],
     sr: int,
-    rng: np.random.Generator,
+    rate: np.ndarray,
+    n_steps: np.ndarray,
     params: object,
+    workers: int,
+    cache: Optional[WarpCache] = None,
+    grain_ids: Optional[Sequence[tuple[str, int]]] = None,
+    cancel: Optional[CancelToken] = None,
+    progress: Optional[ProgressCallback] = None,
 ) -> list[np.ndarray]:
     """
-    Applique warp_grain sur une liste de segments.
+    warp_batch réparti sur `workers` processus (pool partagé de procpool).
+
+    Les décisions sont déjà tirées : les workers n'exécutent que du déterministe,
+    et chaque grain est warpé indépendamment de ses voisins de lot, d'où un
+    résultat identique à warp_batch. Les grains sont copiés une fois en mémoire
+    partagée, triés du plus long au plus court puis découpés en lots de coût
+    comparable (longueurs voisines : peu de padding dans les piles STFT).
+    Peu de grains (< WARP_PARALLEL_MIN_GRAINS) : traitement local.
     """
-    if not segments:
-        return segments
-    return [warp_grain(seg, sr, rng, params) for seg in segments]
+    d = _read_params(params)
+
+    def compute(gs, sr_, r, s, d_):
+        return _warp_rows_parallel(gs, sr_, r, s, d_, workers, cancel, progress)
+
+    return _cached_rows(grains, sr, rate, n_steps, d, cache, grain_ids, compute)
 
 
-def ensure_warp_deps_available() -> None:
+def ensure_warp_deps_available(params: object = None) -> None:
     """
-    Vérifie la disponibilité de librosa. Utile pour afficher une erreur tôt
-    si l'UI active le warp.
+    Vérifie la disponibilité des dépendances du backend choisi (librosa pour
+    le backend "librosa", rien pour "native"). Utile pour afficher une erreur
+    tôt si l'UI active le warp.
     """
-    _import_librosa_required()
+    _require_backend(_read_params(params))
 
 
 # ----------------------------- internals ---------------------------------
@@ -145,7 +527,10 @@ def _read_params(params: object) -> WarpDefaults:
     """
     Lit les paramètres warp depuis `params` (getattr) avec fallback.
     Les noms sont préfixés pour éviter les collisions futures.
+    Un WarpDefaults déjà lu (WarpPlan.settings) est renvoyé tel quel.
     """
+    if isinstance(params, WarpDefaults):
+        return params
     d = WarpDefaults()
 
     # Master
@@ -170,17 +555,234 @@ def _read_params(params: object) -> WarpDefaults:
     # Préserver longueur
     d.preserve_length = bool(getattr(params, "warp_preserve_length", d.preserve_length))
 
+    # Grains courts (WSOLA)
+    d.short_grains = bool(getattr(params, "warp_short_grains", d.short_grains))
+
+    # Moteur
+    d.backend = str(getattr(params, "warp_backend", d.backend))
+    if d.backend not in WARP_BACKENDS:
+        raise ValueError(f"Backend de warp inconnu : {d.backend!r} (attendu : {', '.join(WARP_BACKENDS)}).")
+
+    # Qualité
+    d.quality = str(getattr(params, "warp_quality", d.quality))
+    if d.quality not in WARP_QUALITIES:
+        raise ValueError(f"Qualité de warp inconnue : {d.quality!r} (attendu : {', '.join(WARP_QUALITIES)}).")
+
     return d
 
 
+def _cached_rows(grains, sr, rate, n_steps, d, cache, grain_ids, compute) -> list[np.ndarray]:
+    """Sert les grains présents dans `cache`, calcule les autres via compute(...) puis les stocke."""
+    rate = np.asarray(rate, dtype=np.float64)
+    n_steps = np.asarray(n_steps, dtype=np.float64)
+    if cache is None or grain_ids is None:
+        return compute(grains, sr, rate, n_steps, d)
+
+    keys = [
+        (sid, int(start), len(g), _opt(r), _opt(s), int(sr), d.backend, d.quality, d.preserve_length)
+        for (sid, start), g, r, s in zip(grain_ids, grains, rate.tolist(), n_steps.tolist())
+    ]
+    out: list[Optional[np.ndarray]] = [cache.get(k) for k in keys]
+    todo = [i for i, y in enumerate(out) if y is None]
+    if todo:
+        ys = compute([grains[i] for i in todo], sr, rate[todo], n_steps[todo], d)
+        for i, y in zip(todo, ys):
+            cache.put(keys[i], y)
+            out[i] = y
+    return out
+
+
+def _warp_rows_parallel(
+    grains: list[np.ndarray],
+    sr: int,
+    rate: np.ndarray,
+    n_steps: np.ndarray,
+    d: WarpDefaults,
+    workers: int,
+    cancel: Optional[CancelToken] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> list[np.ndarray]:
+    n = len(grains)
+    workers = max(1, int(workers))
+    if workers == 1 or n < WARP_PARALLEL_MIN_GRAINS:
+        out: list[np.ndarray] = []
+        for lo, hi in iter_batches(n, "warp", cancel, progress):
+            out.extend(_warp_rows(grains[lo:hi], sr, rate[lo:hi], n_steps[lo:hi], d))
+        return out
+
+    from procpool import SharedArray, balanced_chunks, run_chunks  # import lazy
+
+    lengths = np.array([len(g) for g in grains], dtype=np.int64)
+    offsets = np.zeros(n, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    # Lots des grains les plus longs soumis en premier
+    chunks = balanced_chunks(lengths, workers * WARP_CHUNKS_PER_WORKER, longest_first=True)
+
+    flat = np.concatenate([g.astype(np.float32, copy=False) for g in grains])
+    out_rows: list[Optional[np.ndarray]] = [None] * n
+    with SharedArray(flat) as shared:
+        del flat
+        jobs = [(shared.spec, offsets[rows], lengths[rows], rate[rows], n_steps[rows], sr, d) for rows in chunks]
+        parts = run_chunks(
+            workers, _warp_chunk_worker, jobs, [len(rows) for rows in chunks], "warp", cancel, progress
+        )
+    for rows, ys in zip(chunks, parts):
+        for i, y in zip(rows.tolist(), ys):
+            out_rows[i] = y
+    return out_rows
+
+
+def _warp_chunk_worker(
+    source_spec: tuple,
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+    rate: np.ndarray,
+    n_steps: np.ndarray,
+    sr: int,
+    d: WarpDefaults,
+) -> list[np.ndarray]:
+    """Exécuté dans un worker : warpe un lot de grains lus dans la mémoire partagée."""
+    from procpool import call_with_shared
+
+    def _warp(flat: np.ndarray) -> list[np.ndarray]:
+        grains = [flat[o:o + n] for o, n in zip(offsets.tolist(), lengths.tolist())]
+        # _warp_rows renvoie des tableaux neufs (clip) : aucune vue sur la mémoire partagée
+        return _warp_rows(grains, sr, rate, n_steps, d)
+
+    return call_with_shared(source_spec, _warp)
+
+
+def _eligible_min(d: WarpDefaults) -> int:
+    """Longueur minimale d'un grain warpable (tirage des décisions)."""
+    return min(d.short_min_samples, d.min_samples) if d.short_grains else d.min_samples
+
+
+def _require_backend(d: WarpDefaults) -> None:
+    # "draft" n'utilise pas le backend (rééchantillonnage seul)
+    if d.backend == "librosa" and d.quality != "draft":
+        _import_librosa_required()
+
+
+def _opt(x: float) -> Optional[float]:
+    return None if np.isnan(x) else float(x)
+
+
+def _read_intensity(params: object) -> float:
+    return float(np.clip(getattr(params, "intensity", 1.0), 0.0, 2.0))
+
+
+def _draw_plan(
+    rng: np.random.Generator,
+    n: int,
+    d: WarpDefaults,
+    intensity: float,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Tire (rate, n_steps) pour `n` grains éligibles en un seul appel au RNG ;
+    NaN = opération non appliquée. Renvoie aussi le nombre de tirages consommés.
+
+    Chaque grain consomme, dans l'ordre : proba stretch, [rate], proba pitch,
+    [n_steps], soit 2 à 4 uniformes. On tire la borne haute (4 n), on retrouve
+    le début de chaque grain par un scan préfixe sur l'automate à 4 états
+    ci-dessous, puis on ne consomme réellement que les tirages utilisés :
+    le flux du RNG est celui d'une boucle grain par grain.
+    """
+    p_s = _prob_scaled(d.stretch_prob, d.warp_amount, intensity)
+    p_p = _prob_scaled(d.pitch_prob, d.warp_amount, intensity)
+
+    state = rng.bit_generator.state
+    u = rng.random(4 * n)
+
+    # États : 0 = proba stretch, 1 = rate, 2 = proba pitch, 3 = n_steps.
+    # step[k, e] = état après le tirage k s'il est lu dans l'état e.
+    step = np.empty((len(u), 4), dtype=np.int8)
+    step[:, 0] = np.where(u < p_s, 1, 2)
+    step[:, 1] = 2
+    step[:, 2] = np.where(u < p_p, 3, 0)
+    step[:, 3] = 0
+
+    # Composition préfixe (doublement) : step[k] = tirages 0..k enchaînés
+    shift = 1
+    while shift < len(u):
+        step[shift:] = np.take_along_axis(step[shift:], step[:-shift], axis=1)
+        shift *= 2
+    after = step[:, 0]                               # état après chaque tirage, depuis 0
+
+    draws = int(np.flatnonzero(after == 0)[n - 1]) + 1
+    starts = np.concatenate(([0], np.flatnonzero(after[:draws - 1] == 0) + 1))
+
+    # Avance le générateur des seuls tirages consommés
+    rng.bit_generator.state = state
+    rng.random(draws)
+
+    # 1) Time-stretch (probabilité + amplitude modulée)
+    stretch = u[starts] < p_s
+    rate = np.full(n, np.nan)
+    rate[stretch] = _stretch_rates(u[starts[stretch] + 1], d, intensity)
+
+    # 2) Pitch shift (probabilité + amplitude modulée)
+    at = starts + 1 + stretch
+    pitch = u[at] < p_p
+    n_steps = np.full(n, np.nan)
+    n_steps[pitch] = _pitch_steps(u[at[pitch] + 1], d, intensity)
+
+    return rate, n_steps, draws
+
+
+def _apply_decision_librosa(
+    grain: np.ndarray,
+    sr: int,
+    rate: Optional[float],
+    n_steps: Optional[float],
+    d: WarpDefaults,
+    librosa,
+    n_fft_max: int = WARP_N_FFT_MAX,
+    overlap: int = 4,
+) -> np.ndarray:
+    """Backend de référence : librosa.effects, un appel par grain et par opération."""
+    y = grain.astype(np.float32, copy=False)
+
+    if rate is not None:
+        # Garde-fou FFT : choisir une taille adaptée au grain
+        n_fft = _choose_n_fft(len(y), n_fft_max=n_fft_max)
+        # librosa.effects.time_stretch attend rate > 0
+        try:
+            if n_fft:
+                f = fft_setup(n_fft, overlap)
+                y = librosa.effects.time_stretch(
+                    y, rate=rate, n_fft=n_fft, hop_length=f.hop_length, window=f.window
+                ).astype(np.float32)
+        except Exception:
+            # En cas d'échec numérique, on laisse le grain inchangé (fail-soft)
+            y = grain
+
+    if n_steps is not None:
+        n_fft = _choose_n_fft(len(y), n_fft_max=n_fft_max)
+        try:
+            if n_fft:
+                f = fft_setup(n_fft, overlap)
+                y = librosa.effects.pitch_shift(
+                    y, sr=sr, n_steps=n_steps, n_fft=n_fft, hop_length=f.hop_length, window=f.window
+                ).astype(np.float32)
+        except Exception:
+            y = y  # fail-soft
+
+    # Option: préserver la longueur initiale (utile pour conserver le groove global)
+    if d.preserve_length:
+        y = _fit_length(y, target_len=len(grain))
+
+    return np.clip(y, -1.0, 1.0).astype(np.float32)
+
+
 def _import_librosa_required():
     try:
         import librosa  # type: ignore
         return librosa
     except Exception as e:
         raise RuntimeError(
-            "librosa est requis pour le warp (time-stretch / pitch-shift). "
-            "Installer les dépendances (ex: pip install librosa) ou désactiver warp_amount."
+            "librosa est requis pour le backend de warp \"librosa\" (time-stretch / pitch-shift). "
+            "Installer les dépendances (ex: pip install librosa), choisir warp_backend=\"native\" "
+            "ou désactiver warp_amount."
         ) from e
 
 
@@ -195,40 +797,503 @@ def _prob_scaled(base_prob: float, warp_amount: float, intensity: float) -> floa
     return float(np.clip(p, 0.0, 1.0))
 
 
-def _sample_stretch_rate(rng: np.random.Generator, d: WarpDefaults, intensity: float) -> float:
+def _bias_extremes(u: np.ndarray, intensity: float) -> np.ndarray:
+    """Pousse des uniformes vers 0 et 1 si intensity > 1 (identité sinon)."""
+    if intensity > 1.0:
+        k = min(8.0, 1.0 + (intensity - 1.0) * 6.0)
+        u = np.where(u < 0.5, u ** k, 1.0 - ((1.0 - u) ** k))
+    return u
+
+
+def _stretch_rates(u: np.ndarray, d: WarpDefaults, intensity: float) -> np.ndarray:
     """
-    Tire un rate de time-stretch dans [stretch_min, stretch_max].
+    Rates de time-stretch dans [stretch_min, stretch_max] à partir d'uniformes.
     Plus intensity est élevé, plus on tire vers les extrêmes.
     """
     a = float(d.stretch_min)
     b = float(d.stretch_max)
-
-    u = float(rng.random())
-    # bias vers extrêmes si intensity>1
-    if intensity > 1.0:
-        k = min(8.0, 1.0 + (intensity - 1.0) * 6.0)
-        u = (u ** k) if u < 0.5 else (1.0 - ((1.0 - u) ** k))
-
     # warp_amount agit déjà sur la proba; ici on reste borné
-    rate = a + (b - a) * u
+    rate = a + (b - a) * _bias_extremes(u, intensity)
     # sécurité: rate doit être strictement > 0
-    return float(max(0.05, rate))
+    return np.maximum(0.05, rate)
 
 
-def _sample_pitch_steps(rng: np.random.Generator, d: WarpDefaults, intensity: float) -> float:
+def _pitch_steps(u: np.ndarray, d: WarpDefaults, intensity: float) -> np.ndarray:
     """
-    Tire un pitch shift (demi-tons) dans [pitch_min_st, pitch_max_st],
-    avec biais vers extrêmes si intensity>1.
+    Pitch shifts (demi-tons) dans [pitch_min_st, pitch_max_st] à partir
+    d'uniformes, avec biais vers extrêmes si intensity>1.
     """
     a = float(d.pitch_min_st)
     b = float(d.pitch_max_st)
+    return a + (b - a) * _bias_extremes(u, intensity)
 
-    u = float(rng.random())
-    if intensity > 1.0:
-        k = min(8.0, 1.0 + (intensity - 1.0) * 6.0)
-        u = (u ** k) if u < 0.5 else (1.0 - ((1.0 - u) ** k))
 
-    return float(a + (b - a) * u)
+def _warp_rows(
+    grains: list[np.ndarray],
+    sr: int,
+    rate: np.ndarray,
+    n_steps: np.ndarray,
+    d: WarpDefaults,
+) -> list[np.ndarray]:
+    rate = np.asarray(rate, dtype=np.float64)
+    n_steps = np.asarray(n_steps, dtype=np.float64)
+
+    n_fft_max = n_fft_max_for_sr(sr)
+    overlap = 4
+    if d.quality == "high":
+        n_fft_max, overlap = 2 * n_fft_max, 8
+    ys = [g.astype(np.float32, copy=False) for g in grains]
+    lengths = np.array([len(g) for g in grains], dtype=np.int64)
+    todo = ~np.isnan(rate) | ~np.isnan(n_steps)
+
+    if d.quality == "draft":
+        # Varispeed : un seul rééchantillonnage à la vitesse rate * 2^(n/12)
+        rows = np.flatnonzero(todo)
+        speed = np.where(np.isnan(rate[rows]), 1.0, rate[rows]) * np.where(
+            np.isnan(n_steps[rows]), 1.0, 2.0 ** (n_steps[rows] / 12.0)
+        )
+        out_lengths = np.maximum(1, np.round(lengths[rows] / speed)).astype(np.int64)
+        if d.preserve_length:
+            out_lengths = np.minimum(out_lengths, lengths[rows])
+        src = [ys[i] for i in rows.tolist()]
+        for i, y in zip(rows.tolist(), _interp_rows(src, out_lengths, speed, cubic=True)):
+            ys[i] = y
+        todo[:] = False
+
+    short = todo & (lengths < d.min_samples)
+    long_ = todo & ~short
+
+    if d.backend == "librosa":
+        librosa = _import_librosa_required()
+        for i in np.flatnonzero(long_).tolist():
+            ys[i] = _apply_decision_librosa(
+                grains[i], sr, _opt(rate[i]), _opt(n_steps[i]), d, librosa, n_fft_max, overlap
+            )
+        long_[:] = False
+
+    # Stretch + pitch en une passe : stretch au rate combiné
+    # rate_stretch * 2^(-n/12), puis un seul rééchantillonnage (pitch).
+    for rows, phase_vocoder in ((np.flatnonzero(long_), True), (np.flatnonzero(short), False)):
+        if not len(rows):
+            continue
+        s_rate = np.where(np.isnan(rate[rows]), 1.0, rate[rows])
+        p_rate = np.where(np.isnan(n_steps[rows]), 1.0, 2.0 ** (-n_steps[rows] / 12.0))
+        src = [ys[i] for i in rows.tolist()]
+
+        # Longueur finale utile : durée étirée, bornée au grain d'origine si
+        # preserve_length (la suite serait coupée) ; le stretch ne produit que
+        # les échantillons nécessaires à cette longueur avant rééchantillonnage.
+        useful = np.array([int(round(len(y) / r)) for y, r in zip(src, s_rate.tolist())], dtype=np.int64)
+        if d.preserve_length:
+            useful = np.minimum(useful, [len(y) for y in src])
+
+        if not phase_vocoder:
+            # Grains courts : WSOLA (domaine temporel) + interpolation linéaire
+            pv_lengths = np.maximum(1, np.ceil(useful / p_rate)).astype(np.int64)
+            res = _wsola_rows(src, s_rate * p_rate, pv_lengths, sr)
+            res = _interp_rows(res, useful)
+            for i, y in zip(rows.tolist(), res):
+                ys[i] = y
+            continue
+
+        # Rééchantillonnage (pitch) : tailles FFT rapides (n -> m, m / n ~ p)
+        sizes = [
+            (u, u) if p == 1.0 else _resample_sizes(int(np.ceil(u / p)), p)
+            for u, p in zip(useful.tolist(), p_rate.tolist())
+        ]
+        pv_lengths = np.array([n for n, _ in sizes], dtype=np.int64)
+
+        res = _stretch_rows(src, s_rate * p_rate, pv_lengths, n_fft_max, overlap)
+        for i, y0, y, u, (n, m) in zip(rows.tolist(), src, res, useful.tolist(), sizes):
+            if y is y0:
+                continue  # fail-soft : grain laissé tel quel
+            ys[i] = y if n == m else _resample_fft(y, m)[:u]
+
+    out: list[np.ndarray] = []
+    for g, y in zip(grains, ys):
+        # Option: préserver la longueur initiale (utile pour conserver le groove global)
+        if d.preserve_length:
+            y = _fit_length(y, target_len=len(g))
+        out.append(np.clip(y, -1.0, 1.0).astype(np.float32))
+    return out
+
+
+def _stretch_rows(
+    ys: list[np.ndarray],
+    rates: np.ndarray,
+    out_lengths: Optional[np.ndarray] = None,
+    n_fft_max: int = WARP_N_FFT_MAX,
+    overlap: int = 4,
+) -> list[np.ndarray]:
+    """
+    Time-stretch groupé (même algorithme que librosa.effects.time_stretch).
+    `out_lengths` : longueurs produites (défaut : round(len / rate)) ; seules les
+    trames nécessaires sont calculées.
+    Regroupe par (longueur paddée, n_fft) puis traite chaque groupe par lots
+    bornés à WARP_BATCH_ELEMENTS. Grain trop court ou échec numérique : rendu tel quel.
+    """
+    if out_lengths is None:
+        out_lengths = np.array([int(round(len(y) / r)) for y, r in zip(ys, np.asarray(rates).tolist())], dtype=np.int64)
+    out = list(ys)
+    groups: dict[tuple[int, int], list[int]] = {}
+    for i, y in enumerate(ys):
+        n_fft = _choose_n_fft(len(y), n_fft_max=n_fft_max)
+        if n_fft == 0:
+            continue
+        padded = -(-len(y) // n_fft) * n_fft
+        groups.setdefault((padded, n_fft), []).append(i)
+
+    for (padded, n_fft), rows in groups.items():
+        setup = fft_setup(n_fft, overlap)
+        hop_length = setup.hop_length
+        n_bins = n_fft // 2 + 1
+        n_frames = 1 + padded // hop_length
+        chunk: list[int] = []
+        cost = 0
+        for i in rows + [-1]:
+            row_cost = 0 if i < 0 else n_bins * (n_frames + int(out_lengths[i]) // hop_length + 3)
+            if chunk and (i < 0 or cost + row_cost > WARP_BATCH_ELEMENTS):
+                try:
+                    res = _stretch_stack([ys[j] for j in chunk], rates[chunk], out_lengths[chunk], padded, setup)
+                except Exception:
+                    res = None  # fail-soft : grains inchangés
+                if res is not None:
+                    for j, y in zip(chunk, res):
+                        out[j] = y
+                chunk, cost = [], 0
+            if i >= 0:
+                chunk.append(i)
+                cost += row_cost
+    return out
+
+
+def _stretch_stack(
+    ys: list[np.ndarray],
+    rates: np.ndarray,
+    out_lengths: np.ndarray,
+    padded: int,
+    setup: FFTSetup,
+) -> list[np.ndarray]:
+    """
+    STFT / phase vocoder / ISTFT sur des grains empilés (complétés par des zéros
+    jusqu'à `padded` : les trames utiles sont identiques à celles du grain seul).
+    """
+    lengths = np.array([len(y) for y in ys], dtype=np.int64)
+    stack = np.zeros((len(ys), padded), dtype=np.float32)
+    for b, y in enumerate(ys):
+        stack[b, :len(y)] = y
+
+    n_fft, hop_length = setup.n_fft, setup.hop_length
+    D = _stft_rows(stack, setup)
+    n_frames = 1 + lengths // hop_length
+
+    # Longueur synthétisée : durée étirée (comme librosa), bornée à la longueur
+    # demandée ; au-delà, des zéros (l'ISTFT n'y est pas normalisable).
+    natural = np.array([int(round(n / r)) for n, r in zip(lengths.tolist(), rates.tolist())], dtype=np.int64)
+    synth = np.minimum(out_lengths, natural)
+
+    # Trames de sortie : celles du phase vocoder, bornées comme dans librosa.istft
+    pad = n_fft // 2
+    out_frames = np.minimum(
+        np.ceil(n_frames / rates).astype(np.int64),
+        -(-(synth + 2 * pad) // hop_length),
+    )
+    D_stretch = _phase_vocoder_batch(D, rates, n_frames, out_frames, setup)
+    ys_out = _istft_rows(D_stretch, out_frames, synth, setup)
+    return [_fit_length(y, int(n)) for y, n in zip(ys_out, out_lengths.tolist())]
+
+
+def _wsola_rows(
+    ys: list[np.ndarray],
+    rates: np.ndarray,
+    out_lengths: np.ndarray,
+    sr: int,
+) -> list[np.ndarray]:
+    """
+    Time-stretch WSOLA groupé pour grains courts : trames de Hann à 50 % de
+    recouvrement, chaque trame d'analyse est recalée (± un hop) sur la suite
+    naturelle de la précédente par intercorrélation (FFT).
+    Boucle sur les trames de sortie, vectorisée sur les grains (regroupés par
+    taille de trame, lots bornés à WARP_BATCH_ELEMENTS).
+    """
+    frame_max = _pow2_for_sr(WARP_WSOLA_FRAME_MAX, WARP_WSOLA_FRAME_MIN, sr)
+    groups: dict[int, list[int]] = {}
+    for i, y in enumerate(ys):
+        frame = WARP_WSOLA_FRAME_MIN
+        while frame * 2 <= min(frame_max, len(y) // 2):
+            frame *= 2
+        groups.setdefault(frame, []).append(i)
+
+    out = list(ys)
+    for frame, rows in groups.items():
+        row_cost = max(1, 4 * (int(max(len(ys[i]) for i in rows)) + int(max(out_lengths[rows]))))
+        per_batch = max(1, WARP_BATCH_ELEMENTS // row_cost)
+        for lo in range(0, len(rows), per_batch):
+            chunk = rows[lo:lo + per_batch]
+            res = _wsola_stack([ys[j] for j in chunk], rates[chunk], out_lengths[chunk], frame)
+            for j, y in zip(chunk, res):
+                out[j] = y
+    return out
+
+
+def _wsola_stack(
+    ys: list[np.ndarray],
+    rates: np.ndarray,
+    out_lengths: np.ndarray,
+    frame: int,
+) -> list[np.ndarray]:
+    hop = frame // 2
+    tol = hop
+    span = frame + 2 * tol
+
+    n_rows = len(ys)
+    lengths = np.array([len(y) for y in ys], dtype=np.int64)
+    n_out_frames = -(-out_lengths // hop) + 1
+    total = int(n_out_frames.max())
+
+    # Source paddée : tol zéros devant (recalage négatif), marge derrière
+    stack = np.zeros((n_rows, tol + int(lengths.max()) + span + hop), dtype=np.float32)
+    for b, y in enumerate(ys):
+        stack[b, tol:tol + len(y)] = y
+
+    window = np.hanning(frame + 1)[:-1].astype(np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(stack, frame, axis=1)
+    regions = np.lib.stride_tricks.sliding_window_view(stack, span, axis=1)
+    y_out = np.zeros((n_rows, frame + hop * (total - 1)), dtype=np.float32)
+    prev = np.zeros(n_rows, dtype=np.int64)
+
+    for k in range(total):
+        act = np.flatnonzero(k < n_out_frames)
+        nominal = np.minimum(np.round(k * hop * rates[act]).astype(np.int64), lengths[act])
+        if k == 0:
+            pos = nominal
+        else:
+            # Suite naturelle de la trame précédente vs candidats autour du nominal
+            natural = frames[act, prev[act] + hop + tol]
+            corr = np.fft.irfft(
+                np.fft.rfft(regions[act, nominal], axis=1) * np.conj(np.fft.rfft(natural, span, axis=1)),
+                span, axis=1,
+            )[:, :2 * tol + 1]
+            pos = np.clip(nominal - tol + np.argmax(corr, axis=1), 0, lengths[act])
+        y_out[act, k * hop:k * hop + frame] += frames[act, pos + tol] * window
+        prev[act] = pos
+
+    # Somme des fenêtres : identique pour tous les grains sur leur longueur utile
+    # (la dernière trame de chaque grain commence au-delà de out_lengths)
+    w_out = _overlap_add(np.broadcast_to(window, (1, total, frame)), hop)[0]
+    nz = w_out > np.finfo(np.float32).tiny
+    y_out[:, nz] /= w_out[nz]
+    return [_fit_length(y_out[b, :int(n)], int(n)) for b, n in enumerate(out_lengths.tolist())]
+
+
+def _interp_rows(
+    ys: list[np.ndarray],
+    out_lengths: np.ndarray,
+    step: Optional[np.ndarray] = None,
+    cubic: bool = False,
+) -> list[np.ndarray]:
+    """
+    Rééchantillonnage groupé par interpolation (linéaire, ou cubique Catmull-Rom) :
+    ys[b] lu au pas step[b] (défaut : len / out_lengths[b]) sur out_lengths[b]
+    échantillons. Grains mis bout à bout, positions calculées localement à chaque
+    grain (résultat indépendant de la composition du lot).
+    """
+    out_lengths = np.asarray(out_lengths, dtype=np.int64)
+    lengths = np.array([len(y) for y in ys], dtype=np.int64)
+    if not len(ys) or (step is None and np.array_equal(lengths, out_lengths)):
+        return ys
+    if step is None:
+        step = lengths / np.maximum(1, out_lengths)
+    # Grains bout à bout, bordés de leurs valeurs extrêmes (1 avant, 2 après) :
+    # les voisins i-1..i+2 restent dans le grain sans test de bornes
+    flat = np.concatenate([
+        np.concatenate((y[:1], y, y[-1:], y[-1:])) if len(y) else np.zeros(4, dtype=np.float32)
+        for y in ys
+    ]).astype(np.float32, copy=False)
+    starts = np.concatenate(([0], np.cumsum(np.maximum(lengths, 1) + 3)[:-1])) + 1
+    row = np.repeat(np.arange(len(ys)), out_lengths)
+    local = np.arange(len(row)) - np.repeat(np.cumsum(out_lengths) - out_lengths, out_lengths)
+    t = np.minimum(local * np.asarray(step, dtype=np.float64)[row], np.maximum(0, lengths[row] - 1))
+    i1 = t.astype(np.int64)
+    frac = (t - i1).astype(np.float32)
+    i1 += starts[row]
+
+    p1, p2 = flat[i1], flat[i1 + 1]
+    if cubic:
+        p0, p3 = flat[i1 - 1], flat[i1 + 2]
+        res = p1 + 0.5 * frac * (p2 - p0 + frac * (2.0 * p0 - 5.0 * p1 + 4.0 * p2 - p3 + frac * (3.0 * (p1 - p2) + p3 - p0)))
+    else:
+        res = p1 * (1.0 - frac) + p2 * frac
+    return np.split(res.astype(np.float32, copy=False), np.cumsum(out_lengths)[:-1])
+
+
+def _stft_rows(stack: np.ndarray, setup: FFTSetup) -> np.ndarray:
+    """
+    STFT empilée (B, trames, bins), fenêtre de Hann, center=True avec pad nul :
+    mêmes trames que librosa.stft, disposées trame par trame (contiguës).
+    """
+    pad = setup.n_fft // 2
+    padded = np.pad(stack, [(0, 0), (pad, pad)])
+    frames = np.lib.stride_tricks.sliding_window_view(padded, setup.n_fft, axis=1)[:, ::setup.hop_length]
+    return np.fft.rfft(frames * setup.window, axis=2).astype(np.complex64)
+
+
+def _fast_fft_sizes() -> np.ndarray:
+    """Tailles dont tous les facteurs premiers sont <= 13 (rapides pour pocketfft), triées."""
+    global _FAST_SIZES
+    if _FAST_SIZES is None:
+        sizes = [1]
+        for p in (2, 3, 5, 7, 11, 13):
+            grown = []
+            for v in sizes:
+                while v <= _FAST_SIZES_MAX:
+                    grown.append(v)
+                    v *= p
+            sizes = grown
+        _FAST_SIZES = np.array(sorted(sizes), dtype=np.int64)
+    return _FAST_SIZES
+
+
+_FAST_SIZES: Optional[np.ndarray] = None
+_FAST_SIZES_MAX = 1 << 24
+
+
+def _resample_sizes(n_min: int, ratio: float) -> tuple[int, int]:
+    """
+    Couple (n, m) avec n >= n_min, m = round(n * ratio), tous deux rapides pour la
+    FFT : une taille première coûte ~20x plus cher. Erreur de rapport <= 0.5 / n.
+    """
+    sizes = _fast_fft_sizes()
+    fast = set()
+    start = int(np.searchsorted(sizes, n_min))
+    for n in sizes[start:start + 256].tolist():
+        m = int(round(n * ratio))
+        if not fast:
+            fast = set(sizes[np.searchsorted(sizes, m):np.searchsorted(sizes, m * 2)].tolist())
+        if m in fast:
+            return n, m
+    return n_min, int(round(n_min * ratio))
+
+
+def _resample_fft(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Rééchantillonnage à bande limitée par FFT : `y` (même durée) vers `n_out`
+    échantillons. Le grain est traité comme périodique ; les bords sont ensuite
+    masqués par les fades de l'assemblage.
+    """
+    n_in = len(y)
+    if n_in == n_out or n_in == 0 or n_out <= 0:
+        return _fit_length(y, max(0, n_out))
+    spec = np.fft.rfft(y.astype(np.float64))
+    n_bins = n_out // 2 + 1
+    if n_bins <= len(spec):
+        spec = spec[:n_bins]
+    else:
+        spec = np.concatenate([spec, np.zeros(n_bins - len(spec), dtype=spec.dtype)])
+    return (np.fft.irfft(spec, n=n_out) * (n_out / n_in)).astype(np.float32)
+
+
+def _istft_rows(
+    D: np.ndarray,
+    n_frames: np.ndarray,
+    lengths: np.ndarray,
+    setup: FFTSetup,
+) -> list[np.ndarray]:
+    """
+    ISTFT empilée (B, trames, bins), fenêtre de Hann, center=True. Normalisée
+    ligne par ligne sur ses seules trames utiles : chaque grain obtient le résultat
+    de librosa.istft(..., length=n) appliqué seul, quel que soit le lot.
+    """
+    n_rows, total, _ = D.shape
+    pad = setup.n_fft // 2
+    active = (np.arange(total)[None, :] < n_frames[:, None]).astype(np.float32)[:, :, None]
+
+    frames = np.fft.irfft(D, n=setup.n_fft, axis=2).astype(np.float32)
+    frames *= setup.window
+    frames *= active
+    weights = active * setup.window_sq
+
+    y = _overlap_add(frames, setup.hop_length)
+    wss = _overlap_add(weights, setup.hop_length)
+    nz = wss > np.finfo(np.float32).tiny
+    y[nz] /= wss[nz]
+    return [_fit_length(y[b, pad:pad + int(lengths[b])], int(lengths[b])) for b in range(n_rows)]
+
+
+def _overlap_add(frames: np.ndarray, hop_length: int) -> np.ndarray:
+    """Overlap-add de trames empilées (B, trames, n_fft) -> (B, n_fft + hop * (trames - 1))."""
+    n_rows, total, n_fft = frames.shape
+    out = np.zeros((n_rows, n_fft + hop_length * (total - 1)), dtype=np.float32)
+    if n_fft % hop_length == 0:
+        # Chaque trame couvre k blocs de hop échantillons : k additions décalées
+        k = n_fft // hop_length
+        blocks = out.reshape(n_rows, total + k - 1, hop_length)
+        parts = frames.reshape(n_rows, total, k, hop_length)
+        for j in range(k):
+            blocks[:, j:j + total] += parts[:, :, j]
+    else:
+        for t in range(total):
+            out[:, t * hop_length:t * hop_length + n_fft] += frames[:, t]
+    return out
+
+
+def _phase_vocoder_batch(
+    D: np.ndarray,
+    rates: np.ndarray,
+    n_frames: np.ndarray,
+    out_frames: np.ndarray,
+    setup: FFTSetup,
+) -> np.ndarray:
+    """
+    Phase vocoder de librosa vectorisé sur des STFT empilées (B, trames, bins),
+    avec un rate, un nombre de trames utiles et de trames produites par ligne.
+    La boucle sur les trames est remplacée par une somme cumulée des avances de phase.
+    """
+    n_rows, total, n_bins = D.shape
+    rates = np.asarray(rates, dtype=np.float64)
+    n_frames = np.asarray(n_frames, dtype=np.int64)
+
+    # Magnitude / phase calculées une seule fois ; trames au-delà de la fin de
+    # chaque grain nulles (comme le pad de librosa), + 2 trames nulles en queue
+    mask = (np.arange(total)[None, :] < n_frames[:, None])[:, :, None]
+    mag_in = np.zeros((n_rows, total + 2, n_bins), dtype=np.float32)
+    phase_in = np.zeros_like(mag_in)
+    np.multiply(np.abs(D), mask, out=mag_in[:, :total])
+    np.multiply(np.angle(D), mask, out=phase_in[:, :total])
+
+    n_out = int(np.max(out_frames))
+    steps = np.arange(n_out, dtype=np.float64)[None, :] * rates[:, None]   # (B, T_out)
+    valid = ((steps < n_frames[:, None]) & (np.arange(n_out)[None, :] < out_frames[:, None]))[:, :, None]
+    idx = np.minimum(steps.astype(np.int64), total)
+    alpha = (steps - idx).astype(np.float32)[:, :, None]
+    rows = np.arange(n_rows)[:, None]
+
+    # Magnitude interpolée entre les deux trames encadrantes
+    m0 = mag_in[rows, idx]
+    mag = mag_in[rows, idx + 1]
+    mag -= m0
+    mag *= alpha
+    mag += m0
+    mag *= valid
+
+    # Avance de phase attendue par bin, puis écart ramené dans [-pi, pi]
+    phi_advance = setup.phi_advance
+    dphase = phase_in[rows, idx + 1]
+    dphase -= phase_in[rows, idx]
+    dphase -= phi_advance
+    dphase -= np.float32(2.0 * np.pi) * np.round(dphase * np.float32(1.0 / (2.0 * np.pi)))
+    dphase += phi_advance
+
+    # Phase accumulée (somme exclusive) à partir de la phase de la première trame
+    phase = np.empty_like(dphase)
+    phase[:, 0] = phase_in[:, 0]
+    np.cumsum(dphase[:, :-1], axis=1, out=phase[:, 1:])
+    phase[:, 1:] += phase_in[:, :1]
+
+    out = np.empty(phase.shape, dtype=np.complex64)
+    np.multiply(mag, np.cos(phase), out=out.real)
+    np.multiply(mag, np.sin(phase), out=out.imag)
+    return out
 
 
 def _fit_length(y: np.ndarray, target_len: int) -> np.ndarray:
@@ -1,4 +1,6 @@
 # warpocalypse.py
+import multiprocessing
+
 from ui import WarpocalypseApp
 
 
@@ -7,4 +9,6 @@ def main() -> None:
     app.run()
 
 if __name__ == "__main__":
+    # Requis pour le pool de processus (rendu parallèle) dans les builds PyInstaller
+    multiprocessing.freeze_support()
     main()
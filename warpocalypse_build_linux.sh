@@ -116,6 +116,7 @@ pyinstaller \
   --name "${APP_NAME}" \
   --onedir \
   --windowed \
+  --exclude-module librosa \
   "${PROJECT_ROOT}/warpocalypse.py"
 
 [[ -f "${DIST_DIR}/${APP_NAME}/${APP_NAME}" ]] || die "Binaire PyInstaller introuvable: ${DIST_DIR}/${APP_NAME}/${APP_NAME}"
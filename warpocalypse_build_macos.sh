@@ -117,6 +117,7 @@ python -m PyInstaller \
   --name "${APP_NAME}" \
   --onedir \
   --windowed \
+  --exclude-module librosa \
   --icon "${ICON_ICNS}" \
   --add-data "${AIDE_MD}:assets" \
   --add-data "${SPLASH_PNG}:assets" \
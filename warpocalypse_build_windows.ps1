@@ -123,6 +123,7 @@ try {
     --name $AppName `
     --onedir `
     --windowed `
+    --exclude-module librosa `
     --icon $IconPath `
     (Join-Path $ProjectRoot "warpocalypse.py")
 